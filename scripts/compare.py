@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.marker_config import MarkerConfig
+    from scripts.sfm_parser import SliceParser, TextSlice
+    from scripts.sfm_tokenizer import tokenize_lines
+    from scripts.filename_utils import slice_filename, dedupe_filename
+except Exception:
+    try:
+        from marker_config import MarkerConfig
+        from sfm_parser import SliceParser, TextSlice
+        from sfm_tokenizer import tokenize_lines
+        from filename_utils import slice_filename, dedupe_filename
+    except Exception:
+        from .marker_config import MarkerConfig
+        from .sfm_parser import SliceParser, TextSlice
+        from .sfm_tokenizer import tokenize_lines
+        from .filename_utils import slice_filename, dedupe_filename
+
+
+@dataclass
+class Candidate:
+    label: str
+    cfg: MarkerConfig
+    strict: bool
+
+
+@dataclass
+class CandidateResult:
+    candidate: Candidate
+    slices: List[TextSlice] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    filenames: List[str] = field(default_factory=list)
+    untitled: int = 0  # texts without a \t/\te title
+    duplicate_names: int = 0  # filenames that needed a -2, -3, ... suffix
+    # Start lines (0-based) versus the first candidate
+    only_here: List[int] = field(default_factory=list)
+    only_in_first: List[int] = field(default_factory=list)
+
+    @property
+    def starts(self) -> List[int]:
+        return [sl.start for sl in self.slices]
+
+
+def compare_candidates(lines: Sequence[str], candidates: Sequence[Candidate], ext: str = ".txt") -> List[CandidateResult]:
+    """
+    Run every candidate configuration over the same lines in a single pass.
+    The input is tokenized once and each record is fed to one SliceParser per candidate.
+    """
+    parsers = [SliceParser(c.cfg, strict=c.strict) for c in candidates]
+    for rec in tokenize_lines(lines):
+        for parser in parsers:
+            parser.feed_record(rec)
+
+    results: List[CandidateResult] = []
+    for cand, parser in zip(candidates, parsers):
+        slices, warnings = parser.finish(len(lines))
+        res = CandidateResult(candidate=cand, slices=slices, warnings=warnings)
+        existing: set[str] = set()
+        for sl in slices:
+            if not sl.title:
+                res.untitled += 1
+            fname = slice_filename(sl, cand.cfg.join_authors_with, ext=ext)
+            deduped = dedupe_filename(fname, existing)
+            if deduped != fname:
+                res.duplicate_names += 1
+            existing.add(deduped)
+            res.filenames.append(deduped)
+        results.append(res)
+
+    if results:
+        base = set(results[0].starts)
+        for res in results[1:]:
+            mine = set(res.starts)
+            res.only_here = sorted(mine - base)
+            res.only_in_first = sorted(base - mine)
+    return results
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.marker_config import MarkerConfig
+    from scripts.sfm_parser import SliceParser, TextSlice
+    from scripts.sfm_tokenizer import MarkerRecord, tokenize_lines
+    from scripts.io_utils import read_text_preserve
+except Exception:
+    try:
+        from marker_config import MarkerConfig
+        from sfm_parser import SliceParser, TextSlice
+        from sfm_tokenizer import MarkerRecord, tokenize_lines
+        from io_utils import read_text_preserve
+    except Exception:
+        from .marker_config import MarkerConfig
+        from .sfm_parser import SliceParser, TextSlice
+        from .sfm_tokenizer import MarkerRecord, tokenize_lines
+        from .io_utils import read_text_preserve
+
+
+@dataclass
+class CachedDocument:
+    path: str
+    lines: List[str]
+    newline_style: str
+    encoding: str
+    records: List[MarkerRecord]
+
+    def split(self, cfg: MarkerConfig, strict: bool = True) -> Tuple[List[TextSlice], List[str]]:
+        """Boundary pass only: same result as parse_and_split(self.lines, cfg, strict)."""
+        parser = SliceParser(cfg, strict=strict)
+        for rec in self.records:
+            parser.feed_record(rec)
+        return parser.finish(len(self.lines))
+
+
+class DocumentCache:
+    """Small LRU of decoded, tokenized inputs keyed by path, size and mtime."""
+
+    def __init__(self, max_items: int = 4):
+        self.max_items = max_items
+        self._items: "OrderedDict[tuple[str, int, int], CachedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> CachedDocument:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            doc = self._items.get(key)
+            if doc is not None:
+                self._items.move_to_end(key)
+                return doc
+        lines, newline_style, enc = read_text_preserve(path)
+        doc = CachedDocument(path, lines, newline_style, enc, list(tokenize_lines(lines)))
+        with self._lock:
+            # Drop stale versions of the same file before adding the new one
+            for k in [k for k in self._items if k[0] == key[0]]:
+                del self._items[k]
+            self._items[key] = doc
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return doc
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
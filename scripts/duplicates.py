@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import unicodedata
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+DUPLICATES_REPORT_NAME = "sfm-duplicates.json"
+DUPLICATE_POLICIES = ("keep", "skip", "link")
+
+
+def content_key(lines: Iterable[str]) -> str:
+    """
+    Hash of a text's normalized content: NFC, whitespace runs collapsed, blank
+    lines ignored. Independent of the file encoding and newline style, so copies
+    from differently encoded exports still match.
+    """
+    h = hashlib.sha256()
+    for line in lines:
+        norm = " ".join(unicodedata.normalize("NFC", line).split())
+        if norm:
+            h.update(norm.encode("utf-8"))
+            h.update(b"\n")
+    return h.hexdigest()
+
+
+@dataclass
+class DuplicateHit:
+    filename: str  # name the duplicate would have been written as
+    start_line: int  # 1-based, inclusive
+    end_line: int
+    source: str
+    duplicate_of: str  # absolute path of the first copy (or its filename if no files were written)
+    original_source: str
+    action: str  # "skipped", "linked" or "written"
+
+
+class DuplicateIndex:
+    """
+    Content hash -> first copy seen. With a path it is loaded and saved as JSON,
+    so several runs (one per export) can share it and skip texts an earlier run wrote.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._seen: Dict[str, Dict[str, str]] = {}
+        self._added: Set[str] = set()  # keys first seen in this run (not loaded from path)
+        self._transient: Set[str] = set()  # keys of texts not written to a file: kept out of the saved index
+        self.hits: List[DuplicateHit] = []
+        if path and os.path.isfile(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    # Only entries for written files; bare names cannot be linked to or merged from
+                    self._seen = {k: v for k, v in data.items()
+                                  if isinstance(v, dict) and os.path.isabs(str(v.get("path", "")))}
+            except (OSError, ValueError):
+                self._seen = {}
+
+    def lookup(self, key: str) -> Optional[Dict[str, str]]:
+        return self._seen.get(key)
+
+    def add(self, key: str, source: str, path: str, persist: bool = True) -> None:
+        """Remember the first copy; persist=False for texts with no file (e.g. a --sqlite-only run)."""
+        if key not in self._seen:
+            self._seen[key] = {"source": source, "path": path}
+            self._added.add(key)
+            if not persist:
+                self._transient.add(key)
+
+    def added_this_run(self, key: str) -> bool:
+        return key in self._added
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({k: v for k, v in self._seen.items() if k not in self._transient}, f, ensure_ascii=False, indent=0)
+        os.replace(tmp, self.path)
+
+    def write_report(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([asdict(h) for h in self.hits], f, ensure_ascii=False, indent=1)
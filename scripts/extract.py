@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.marker_config import MarkerConfig
+    from scripts.sfm_parser import TextSlice, iter_text_slices, parse_and_split
+    from scripts.sfm_tokenizer import tokenize_file
+    from scripts.io_utils import detect_compression, detect_newline_style_bytes, is_ascii_compatible, open_input, read_text_preserve, sniff_encoding
+    from scripts.manifest import Manifest
+except Exception:
+    try:
+        from marker_config import MarkerConfig
+        from sfm_parser import TextSlice, iter_text_slices, parse_and_split
+        from sfm_tokenizer import tokenize_file
+        from io_utils import detect_compression, detect_newline_style_bytes, is_ascii_compatible, open_input, read_text_preserve, sniff_encoding
+        from manifest import Manifest
+    except Exception:
+        from .marker_config import MarkerConfig
+        from .sfm_parser import TextSlice, iter_text_slices, parse_and_split
+        from .sfm_tokenizer import tokenize_file
+        from .io_utils import detect_compression, detect_newline_style_bytes, is_ascii_compatible, open_input, read_text_preserve, sniff_encoding
+        from .manifest import Manifest
+
+# Bytes sampled to guess the newline style when streaming
+NEWLINE_SAMPLE_BYTES = 1 << 20
+
+
+@dataclass
+class Selectors:
+    ids: List[str] = field(default_factory=list)  # exact \id values
+    titles: List["re.Pattern[str]"] = field(default_factory=list)  # searched in the title
+    seqs: List[str] = field(default_factory=list)  # exact \no values
+    slices: List[int] = field(default_factory=list)  # 1-based position among detected texts
+
+    def keys(self) -> Set[Tuple[str, str]]:
+        return ({("id", v) for v in self.ids} | {("title", p.pattern) for p in self.titles}
+                | {("seq", v) for v in self.seqs} | {("slice", str(n)) for n in self.slices})
+
+    def match(self, n: int, title: Optional[str], id_value: Optional[str], seq_no: Optional[str]) -> Set[Tuple[str, str]]:
+        """Keys of the selectors that text number n (1-based) satisfies."""
+        hits: Set[Tuple[str, str]] = set()
+        if id_value is not None and id_value in self.ids:
+            hits.add(("id", id_value))
+        if seq_no is not None and seq_no in self.seqs:
+            hits.add(("seq", seq_no))
+        if n in self.slices:
+            hits.add(("slice", str(n)))
+        if title:
+            hits.update(("title", p.pattern) for p in self.titles if p.search(title))
+        return hits
+
+
+def select(texts: Iterable[Tuple[TextSlice, List[str]]], selectors: Selectors, all_matches: bool = False,
+           unmatched: Optional[Set[Tuple[str, str]]] = None) -> Iterator[Tuple[TextSlice, List[str]]]:
+    """
+    Filter (slice, lines) pairs. By default each selector takes its first match and
+    iteration stops as soon as every selector is satisfied; all_matches scans to the end.
+    If given, `unmatched` is filled with the selector keys and emptied as they match,
+    so after the iteration it holds the selectors that matched nothing.
+    """
+    remaining = unmatched if unmatched is not None else set()
+    remaining.clear()
+    remaining.update(selectors.keys())
+    for n, (sl, lines) in enumerate(texts, start=1):
+        hits = selectors.match(n, sl.title, sl.id_value, sl.seq_no)
+        if hits and (all_matches or hits & remaining):
+            yield sl, lines
+        remaining -= hits
+        if not remaining and not all_matches:
+            return
+
+
+def index_matches_source(manifest: Manifest, input_path: str) -> bool:
+    """True if the manifest was written for this exact source and knows every byte range."""
+    if manifest.source_member or detect_compression(input_path):
+        # Byte ranges of compressed input cannot be seeked to
+        return False
+    try:
+        st = os.stat(input_path)
+    except OSError:
+        return False
+    if st.st_size != manifest.source_size or st.st_mtime_ns != manifest.source_mtime_ns:
+        return False
+    return all(e.source_start is not None and e.source_end is not None for e in manifest.entries)
+
+
+def iter_indexed(input_path: str, manifest: Manifest, selectors: Selectors, all_matches: bool = False,
+                 unmatched: Optional[Set[Tuple[str, str]]] = None) -> Iterator[Tuple[TextSlice, List[str]]]:
+    """Select texts from the manifest's metadata and read only their byte ranges."""
+    entries = sorted(manifest.entries, key=lambda e: e.start_line)
+    candidates = (
+        (TextSlice(e.start_line, e.end_line, e.title, list(e.authors), e.id_value, e.seq_no, e.source_start, e.source_end), [])
+        for e in entries
+    )
+    with open(input_path, 'rb') as f:
+        for sl, _ in select(candidates, selectors, all_matches, unmatched):
+            f.seek(sl.byte_start)  # type: ignore[arg-type]
+            raw = f.read(sl.byte_end - sl.byte_start)  # type: ignore[operator]
+            lines = raw.decode(manifest.input_encoding, errors='replace').splitlines()
+            # The range stops before the last line's terminator: an empty last line leaves no trace
+            lines += [""] * (sl.end - sl.start + 1 - len(lines))
+            yield sl, lines
+
+
+def stream_texts(input_path: str, cfg: MarkerConfig, strict: bool, encoding: Optional[str] = None,
+                 member: Optional[str] = None, errors: str = "replace") -> Tuple[Iterator[Tuple[TextSlice, List[str]]], str, str]:
+    """
+    Stream the input (decompressing it if needed) and yield (slice, lines) as each
+    text completes; undecodable bytes are handled by `errors`. Returns (texts, newline_style, encoding).
+    """
+    # A head sample: reading the whole file up front would defeat early stopping
+    enc = encoding or sniff_encoding(input_path, member)[0]
+    if not is_ascii_compatible(enc):
+        # e.g. UTF-16: no line streaming, parse the whole file instead
+        lines, newline_style, enc = read_text_preserve(input_path, encoding=encoding, member=member, errors=errors)
+        slices, _warnings = parse_and_split(lines, cfg, strict=strict)
+        return ((sl, lines[sl.start:sl.end + 1]) for sl in slices), newline_style, enc
+    with open_input(input_path, member) as f:
+        newline_style = detect_newline_style_bytes(f.read(NEWLINE_SAMPLE_BYTES))
+    return iter_text_slices(tokenize_file(input_path, enc, member=member, errors=errors), cfg, strict=strict), newline_style, enc
+
+
+def iter_streamed(input_path: str, cfg: MarkerConfig, strict: bool, selectors: Selectors, encoding: Optional[str] = None,
+                  all_matches: bool = False, member: Optional[str] = None,
+                  errors: str = "replace", unmatched: Optional[Set[Tuple[str, str]]] = None
+                  ) -> Tuple[Iterator[Tuple[TextSlice, List[str]]], str, str]:
+    """
+    Stream the input and select texts as they complete; reading stops with the
+    iteration. Returns (texts, newline_style, encoding).
+    """
+    texts, newline_style, enc = stream_texts(input_path, cfg, strict, encoding=encoding, member=member, errors=errors)
+    return select(texts, selectors, all_matches, unmatched), newline_style, enc
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import hashlib
 import re
 import unicodedata
 from typing import Iterable, Optional
@@ -50,13 +51,72 @@ def make_filename(title: Optional[str], authors: Iterable[str], ext: str = ".txt
     return f"{base}{ext}"
 
 
+def slice_filename(sl, join_authors_with: str, ext: str = ".txt") -> str:
+    """Filename for a parsed TextSlice: title/authors, else \\id value, else \\no sequence."""
+    authors_joined = join_authors_with.join(sl.authors) if sl.authors else ""
+    fallback = None
+    if sl.id_value:
+        fallback = sl.id_value
+    elif sl.seq_no:
+        fallback = f"no{sl.seq_no}"
+    return make_filename(sl.title, [authors_joined] if authors_joined else [], ext=ext, fallback=fallback)
+
+
+def member_dirname(member: str) -> str:
+    """Output subfolder for a zip member: the slug of its file stem."""
+    stem, dot, ext = member.rstrip("/").rpartition(".")
+    if not dot or "/" in ext:
+        stem = member.rstrip("/")
+    # Keep the folders of the member path so same-named files stay apart
+    return _ascii_slug(stem.replace("/", "-")) or "member"
+
+
 def dedupe_filename(name: str, existing: set[str]) -> str:
     if name not in existing:
         return name
     stem, dot, ext = name.rpartition(".")
+    if not dot:
+        stem = name
     counter = 2
     while True:
         candidate = f"{stem}-{counter}.{ext}" if dot else f"{stem}-{counter}"
         if candidate not in existing:
             return candidate
         counter += 1
+
+
+SHARD_LAYOUTS = {"flat": 0, "prefix": 2, "range": 1000, "hash": 256}
+
+
+def parse_layout(spec: str) -> tuple[str, int]:
+    """Parse 'flat', 'prefix[:chars]', 'range[:texts_per_folder]' or 'hash[:buckets]'."""
+    name, _, arg = (spec or "flat").strip().lower().partition(":")
+    if name not in SHARD_LAYOUTS:
+        raise ValueError(f"Unknown layout '{spec}'; expected one of {', '.join(SHARD_LAYOUTS)}.")
+    size = SHARD_LAYOUTS[name]
+    if arg:
+        try:
+            size = int(arg)
+        except ValueError:
+            raise ValueError(f"Invalid layout size in '{spec}'.")
+        if size < 1:
+            raise ValueError(f"Layout size must be positive in '{spec}'.")
+    return name, size
+
+
+def shard_path(name: str, index: int, layout: str, size: int) -> str:
+    """Return the '/'-separated path of output `name` (the index-th text, 0-based) under a layout."""
+    if layout == "prefix":
+        stem = name.rpartition(".")[0] or name
+        prefix = "".join(c if c.isalnum() else "_" for c in stem[:size].lower())
+        folder = prefix.ljust(size, "_")
+    elif layout == "range":
+        lo = (index // size) * size + 1
+        folder = f"{lo:06d}-{lo + size - 1:06d}"
+    elif layout == "hash":
+        # Stable across runs and platforms, unlike hash()
+        bucket = int(hashlib.md5(name.encode("utf-8")).hexdigest()[:8], 16) % size
+        folder = f"{bucket:0{len(f'{size - 1:x}')}x}"
+    else:
+        return name
+    return f"{folder}/{name}"
@@ -1,8 +1,32 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import bz2
+import codecs
+import gzip
+import lzma
 import os
-from typing import Tuple, Optional
+import re
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple
+
+_raw_newline_re = re.compile(rb"\r\n|\r|\n")
+
+# Characters handed to the output encoder at a time
+WRITE_CHUNK_CHARS = 1 << 16
+# Magic bytes of the compressed/archive formats read transparently
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"BZh", "bz2"),
+    (b"PK\x03\x04", "zip"),
+)
+# Errors raised by corrupt or truncated compressed input
+DECOMPRESSION_ERRORS = (EOFError, gzip.BadGzipFile, lzma.LZMAError, zlib.error, zipfile.BadZipFile)
+# Decompressed bytes sampled for encoding detection of compressed input
+DETECT_SAMPLE_BYTES = 4 << 20
+ENCODING_ERROR_POLICIES = ("strict", "replace", "ignore", "xmlcharrefreplace", "backslashreplace")
 
 
 def detect_newline_style_bytes(data: bytes) -> str:
@@ -16,8 +40,91 @@ def detect_newline_style_bytes(data: bytes) -> str:
     return "\n"
 
 
-def detect_encoding(path: str) -> Tuple[str, float, bool]:
+def detect_compression(path: str) -> Optional[str]:
+    """Return 'gzip', 'xz', 'bz2' or 'zip' from the file's magic bytes, or None for plain files."""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, kind in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def _looks_like_sfm(head: bytes) -> bool:
+    for bom in (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff"):
+        if head.startswith(bom):
+            head = head[len(bom):].replace(b"\x00", b"")
+            break
+    return head.lstrip().startswith(b"\\")
+
+
+def sfm_members(path: str) -> list[str]:
+    """Names of the zip members that look like SFM (.sfm, or content starting with a marker)."""
+    names = []
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            with zf.open(info) as m:
+                head = m.read(64)
+            if info.filename.lower().endswith(".sfm") or _looks_like_sfm(head):
+                names.append(info.filename)
+    return names
+
+
+def open_input(path: str, member: Optional[str] = None) -> BinaryIO:
+    """
+    Open an input for binary reading, decompressing gzip/xz/bz2 on the fly.
+    For zip archives, `member` picks the entry; without it the archive must hold exactly one SFM member.
+    """
+    kind = detect_compression(path)
+    if kind == "gzip":
+        return gzip.open(path, 'rb')  # type: ignore[return-value]
+    if kind == "xz":
+        return lzma.open(path, 'rb')  # type: ignore[return-value]
+    if kind == "bz2":
+        return bz2.open(path, 'rb')  # type: ignore[return-value]
+    if kind == "zip":
+        if member is None:
+            members = sfm_members(path)
+            if len(members) != 1:
+                raise ValueError(f"{os.path.basename(path)} holds {len(members)} SFM members; choose one.")
+            member = members[0]
+        zf = zipfile.ZipFile(path)
+        # The member stream keeps the archive file open until it is closed
+        return zf.open(member)
+    return open(path, 'rb')
+
+
+def detect_encoding_bytes(raw: bytes) -> Tuple[str, float, bool]:
+    """Like detect_encoding(), for data already in memory."""
+    enc = "utf-8"
+    conf = 1.0
+    has_bom = raw.startswith(b"\xef\xbb\xbf")
+    try:
+        from charset_normalizer import from_bytes
+        res = from_bytes(raw)
+        best = res.best() if res else None
+        if best:
+            enc = best.encoding or enc
+            conf = float(best.encoding_aliases and 0.8 or 0.6)
+    except Exception:
+        try:
+            import chardet  # type: ignore
+            det = chardet.detect(raw)
+            enc = det.get('encoding') or enc
+            conf = float(det.get('confidence') or 0.5)
+        except Exception:
+            enc = "utf-8"
+            conf = 0.5
+    return enc, conf, has_bom
+
+
+def detect_encoding(path: str, member: Optional[str] = None) -> Tuple[str, float, bool]:
     """Return (encoding, confidence, has_bom) using charset-normalizer or chardet."""
+    if member is not None or detect_compression(path):
+        # Sniff a sample of the decompressed stream
+        return sniff_encoding(path, member)
     enc = "utf-8"
     conf = 1.0
     has_bom = False
@@ -52,20 +159,47 @@ def detect_encoding(path: str) -> Tuple[str, float, bool]:
     return enc, conf, has_bom
 
 
-def read_text_preserve(path: str) -> Tuple[list[str], str, str]:
-    """Read file, returning (lines_without_newlines, newline_style, encoding)."""
-    with open(path, 'rb') as fb:
+def sniff_encoding(path: str, member: Optional[str] = None) -> Tuple[str, float, bool]:
+    """Like detect_encoding(), from the first DETECT_SAMPLE_BYTES only, for readers that stream the input."""
+    with open_input(path, member) as f:
+        raw = f.read(DETECT_SAMPLE_BYTES)
+    if len(raw) == DETECT_SAMPLE_BYTES:
+        # Cut at a line end so a multibyte character split by the limit does not skew detection
+        cut = max(raw.rfind(b"\n"), raw.rfind(b"\r"))
+        if cut > 0:
+            raw = raw[:cut + 1]
+    enc, conf, has_bom = detect_encoding_bytes(raw)
+    if codecs.lookup(enc).name == "ascii":
+        # An ASCII head says nothing about the rest; UTF-8 reads it the same
+        enc = "utf-8"
+    return enc, conf, has_bom
+
+
+def read_text_preserve(path: str, encoding: Optional[str] = None, member: Optional[str] = None,
+                       errors: str = "replace") -> Tuple[list[str], str, str]:
+    """Read file, returning (lines_without_newlines, newline_style, encoding).
+
+    If encoding is given it is used instead of auto-detection; undecodable bytes are then
+    handled by `errors` (e.g. a CountingErrors handler), as on the UTF-8 fallback.
+    Compressed files and zip members (see open_input) are decompressed on the fly.
+    """
+    compressed = member is not None or detect_compression(path) is not None
+    with open_input(path, member) as fb:
         raw = fb.read()
     newline_style = detect_newline_style_bytes(raw)
-    # Detect encoding
-    enc, conf, has_bom = detect_encoding(path)
-    # Decode
-    try:
-        text = raw.decode(enc)
-    except Exception:
-        # Fallback to utf-8
-        enc = "utf-8"
-        text = raw.decode(enc, errors='replace')
+    if encoding:
+        enc = encoding
+        text = raw.decode(enc, errors=errors)
+    else:
+        # Detect encoding
+        enc, conf, has_bom = detect_encoding_bytes(raw) if compressed else detect_encoding(path)
+        # Decode
+        try:
+            text = raw.decode(enc)
+        except Exception:
+            # Fallback to utf-8
+            enc = "utf-8"
+            text = raw.decode(enc, errors=errors)
     # Strip BOM in decoded
     if text.startswith("\ufeff"):
         text = text[1:]
@@ -74,9 +208,191 @@ def read_text_preserve(path: str) -> Tuple[list[str], str, str]:
     return lines, newline_style, enc
 
 
-def write_lines_preserve(path: str, lines: list[str], newline_style: str, encoding: str) -> None:
+class CountingErrors:
+    """Codec error handler that applies a standard policy and counts the characters (or bytes, when decoding) it replaced."""
+
+    _registered: dict[tuple[str, str], "CountingErrors"] = {}
+
+    def __init__(self, policy: str, scope: str = ""):
+        self.policy = policy
+        self.name = f"sfm-counting-{scope}-{policy}" if scope else f"sfm-counting-{policy}"
+        self.count = 0
+        self._base = codecs.lookup_error(policy)
+
+    @classmethod
+    def get(cls, policy: str, scope: str = "") -> "CountingErrors":
+        """Shared handler for a policy, registered with codecs on first use; scopes keep separate counts."""
+        handler = cls._registered.get((policy, scope))
+        if handler is None:
+            handler = cls(policy, scope)
+            codecs.register_error(handler.name, handler)
+            cls._registered[(policy, scope)] = handler
+        return handler
+
+    def __call__(self, exc):
+        if isinstance(exc, (UnicodeEncodeError, UnicodeDecodeError)):
+            self.count += exc.end - exc.start
+        return self._base(exc)
+
+
+def write_lines_preserve(path: str, lines: list[str], newline_style: str, encoding: str, hasher=None, errors: str = "strict") -> int:
+    """Write lines joined by newline_style; returns the byte count and feeds hasher if given.
+
+    Text is encoded in chunks through an incremental encoder, so transcoding to another
+    encoding needs no extra pass; `errors` is any codec error handler name.
+    """
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    text = newline_style.join(lines)
-    with open(path, 'w', encoding=encoding, newline='') as f:
-        # writing with explicit newline='' prevents universal-newline translation
-        f.write(text)
+    encoder = codecs.getincrementalencoder(encoding)(errors)
+    written = 0
+    pending: list[str] = []
+    pending_chars = 0
+    with open(path, 'wb') as f:
+        for i, line in enumerate(lines):
+            if i:
+                pending.append(newline_style)
+            pending.append(line)
+            pending_chars += len(line)
+            if pending_chars >= WRITE_CHUNK_CHARS:
+                data = encoder.encode("".join(pending))
+                pending.clear()
+                pending_chars = 0
+                f.write(data)
+                written += len(data)
+                if hasher is not None:
+                    hasher.update(data)
+        data = encoder.encode("".join(pending), final=True)
+        f.write(data)
+        written += len(data)
+        if hasher is not None:
+            hasher.update(data)
+    return written
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    try:
+        return "\n\r\\".encode(encoding) == b"\n\r\\"
+    except Exception:
+        return False
+
+
+def iter_raw_lines(fb: BinaryIO, chunk_size: int = 1 << 20, offset: int = 0) -> Iterator[Tuple[int, bytes, bytes]]:
+    """Yield (byte_offset, content, terminator) for each line of a binary stream.
+
+    Recognizes CRLF, LF and lone CR; the last line has an empty terminator.
+    """
+    buf = b""
+    base = offset
+    eof = False
+    while not eof:
+        chunk = fb.read(chunk_size)
+        eof = not chunk
+        buf += chunk
+        start = 0
+        for m in _raw_newline_re.finditer(buf):
+            if not eof and m.end() == len(buf) and m.group() == b"\r":
+                # may be the first half of a CRLF split across chunks
+                break
+            yield base + start, buf[start:m.start()], m.group()
+            start = m.end()
+        buf = buf[start:]
+        base += start
+    if buf:
+        yield base, buf, b""
+
+
+def line_ranges_to_bytes(path: str, lines: list[str], ranges: list[Tuple[int, int]], newline_style: str, encoding: str) -> Optional[list[Tuple[int, int]]]:
+    """
+    Map sorted (start, end) inclusive line ranges of read_text_preserve() output to
+    source byte ranges (end excludes the last line's terminator).
+
+    Assumes every line ends with newline_style; returns None when the sizes do not
+    add up to the file size (mixed newlines, replaced bytes, ...) or the encoding
+    is not ASCII-compatible.
+    """
+    if not is_ascii_compatible(encoding):
+        return None
+    size = os.path.getsize(path)
+    nl_bytes = newline_style.encode(encoding)
+    with open(path, 'rb') as f:
+        head = f.read(4)
+        f.seek(max(0, size - len(nl_bytes)))
+        trailing_newline = f.read() == nl_bytes
+    try:
+        bom = "\ufeff".encode(encoding)
+    except UnicodeEncodeError:
+        bom = b""
+    pos = len(bom) if bom and head.startswith(bom) else 0
+    nl_len = len(nl_bytes)
+    starts = {start: k for k, (start, _end) in enumerate(ranges)}
+    ends = {end: k for k, (_start, end) in enumerate(ranges)}
+    out: list[list[int]] = [[0, 0] for _ in ranges]
+    for i, line in enumerate(lines):
+        k = starts.get(i)
+        if k is not None:
+            out[k][0] = pos
+        pos += len(line.encode(encoding, errors='replace'))
+        k = ends.get(i)
+        if k is not None:
+            out[k][1] = pos
+        pos += nl_len
+    if lines and not trailing_newline:
+        pos -= nl_len
+    if pos != size:
+        return None
+    return [(a, b) for a, b in out]
+
+
+class SourceLine(NamedTuple):
+    index: int        # 0-based, same numbering as read_text_preserve()
+    start: int        # byte offset of the line content
+    end: int          # byte offset just past the content (terminator excluded)
+    text: str
+    terminator: bytes
+    decoded_ok: bool
+
+
+def iter_source_lines(path: str, encoding: str, chunk_size: int = 1 << 20, member: Optional[str] = None,
+                      errors: str = "replace") -> Iterator[SourceLine]:
+    """Stream decoded lines with byte offsets, splitting exactly like read_text_preserve().
+
+    Only ASCII-compatible encodings can be streamed this way (UTF-8, Windows codepages, ...).
+    Undecodable lines are decoded with `errors` and flagged. Offsets of compressed input
+    refer to the decompressed data.
+    """
+    if not is_ascii_compatible(encoding):
+        raise ValueError(f"Cannot stream {encoding} input line by line.")
+    index = 0
+    with open_input(path, member) as fb:
+        for offset, raw, term in iter_raw_lines(fb, chunk_size):
+            try:
+                text = raw.decode(encoding)
+                ok = True
+            except UnicodeDecodeError:
+                text = raw.decode(encoding, errors=errors)
+                ok = False
+            if index == 0 and text.startswith("\ufeff"):
+                offset += len("\ufeff".encode(encoding))
+                raw = raw[len("\ufeff".encode(encoding)):]
+                text = text[1:]
+                if not raw and not term:
+                    break
+            # str.splitlines() also breaks on FF, VT, NEL, LS/PS, ...; mirror that
+            parts = text.splitlines(keepends=True)
+            if len(parts) <= 1 and (not parts or parts[0].splitlines()[0] == parts[0]):
+                yield SourceLine(index, offset, offset + len(raw), text, term, ok)
+                index += 1
+                continue
+            pos = offset
+            sep = ""
+            for part in parts:
+                body = part.splitlines()[0]
+                sep = part[len(body):]
+                body_len = len(body.encode(encoding, errors='replace'))
+                sep_bytes = sep.encode(encoding, errors='replace') if sep else term
+                yield SourceLine(index, pos, pos + body_len, body, sep_bytes, ok)
+                index += 1
+                pos += body_len + len(sep_bytes)
+            if sep and term:
+                # text ended on a separator character: the raw terminator closes an empty line
+                yield SourceLine(index, pos, pos, "", term, ok)
+                index += 1
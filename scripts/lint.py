@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.marker_config import MarkerConfig
+    from scripts.sfm_parser import SliceParser, TextSlice
+    from scripts.sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+    from scripts.io_utils import is_ascii_compatible, read_text_preserve, sniff_encoding
+except Exception:
+    try:
+        from marker_config import MarkerConfig
+        from sfm_parser import SliceParser, TextSlice
+        from sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+        from io_utils import is_ascii_compatible, read_text_preserve, sniff_encoding
+    except Exception:
+        from .marker_config import MarkerConfig
+        from .sfm_parser import SliceParser, TextSlice
+        from .sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+        from .io_utils import is_ascii_compatible, read_text_preserve, sniff_encoding
+
+LINT_KINDS = ("before_first_text", "unknown_marker", "stray_line", "untitled", "duplicate_id")
+
+
+@dataclass
+class Diagnostic:
+    kind: str
+    first_line: int  # 1-based, inclusive
+    last_line: int
+    detail: str = ""
+
+
+@dataclass
+class LintResult:
+    encoding: str = ""
+    lines: int = 0
+    texts: int = 0
+    # First diagnostics of each kind (up to the cap), in input order
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)  # all diagnostics per kind, shown or not (distinct unknown markers)
+    unknown_markers: Dict[str, int] = field(default_factory=dict)  # occurrences per unknown marker
+
+    @property
+    def ok(self) -> bool:
+        return not self.counts
+
+
+class _Linter:
+    def __init__(self, cfg: MarkerConfig, strict: bool, max_per_kind: int):
+        self.cfg = cfg
+        self.parser = SliceParser(cfg, strict=strict)
+        self.max_per_kind = max_per_kind
+        self.result = LintResult()
+        self.known: Set[str] = cfg.start_markers | cfg.metadata_markers | cfg.content_markers | set(cfg.title_priority)
+        self.ids: Dict[str, int] = {}  # \id value -> first line of the text that has it
+        self.attached = False  # last line belongs to a field (marker line or its wrapped continuation)
+        self.outside: Optional[List[int]] = None  # [first, last, count] of non-blank lines before the first text
+        self.stray: Optional[List[int]] = None  # open run of stray lines [first, last]
+
+    def add(self, kind: str, first: int, last: int, detail: str) -> None:
+        n = self.result.counts.get(kind, 0) + 1
+        self.result.counts[kind] = n
+        if n <= self.max_per_kind:
+            self.result.diagnostics.append(Diagnostic(kind, first + 1, last + 1, detail))
+
+    def _flush_stray(self) -> None:
+        if self.stray is not None:
+            first, last = self.stray
+            n = last - first + 1
+            self.add("stray_line", first, last, "line does not start with a marker and follows a blank line"
+                     if n == 1 else f"{n} lines without a marker after a blank line")
+            self.stray = None
+
+    def _text_done(self, sl: TextSlice) -> None:
+        self.result.texts += 1
+        if not sl.title:
+            self.add("untitled", sl.start, sl.end, "text has no " + "/".join(f"\\{m}" for m in self.cfg.title_priority) + " title")
+        if sl.id_value:
+            first = self.ids.setdefault(sl.id_value, sl.start)
+            if first != sl.start:
+                self.add("duplicate_id", sl.start, sl.end, f"\\id {sl.id_value} already used by the text at line {first + 1}")
+
+    def feed(self, rec: MarkerRecord) -> None:
+        parser = self.parser
+        started = parser.in_text or bool(parser.slices)
+        committed = len(parser.slices)
+        parser.feed_record(rec)
+        if len(parser.slices) > committed:
+            self._text_done(parser.slices[-1])
+
+        if rec.marker is not None and rec.marker not in self.known:
+            counts = self.result.unknown_markers
+            counts[rec.marker] = counts.get(rec.marker, 0) + 1
+            if counts[rec.marker] == 1:
+                # One diagnostic per distinct marker, so repeats cannot use up the cap
+                self.add("unknown_marker", rec.first_line, rec.first_line, f"\\{rec.marker} is not a start, metadata or content marker")
+
+        # Lines before the first text are dropped; inside texts, unattached unmarked lines are stray
+        text_start = parser.current_start if parser.in_text else None
+        first = rec.first_line
+        if rec.marker is not None:
+            if self.stray is not None:
+                self._flush_stray()
+            self.attached = True
+            if not started and text_start is None:
+                self._outside(first)
+            if rec.last_line == first:
+                return
+            first += 1
+        for i in range(first, rec.last_line + 1):
+            if not rec.line(i).strip():
+                self._flush_stray()
+                self.attached = False
+            elif not started and (text_start is None or i < text_start):
+                self._outside(i)
+            elif not self.attached:
+                if self.stray is not None and self.stray[1] == i - 1:
+                    self.stray[1] = i
+                else:
+                    self._flush_stray()
+                    self.stray = [i, i]
+
+    def _outside(self, i: int) -> None:
+        if self.outside is None:
+            self.outside = [i, i, 1]
+        else:
+            self.outside[1] = i
+            self.outside[2] += 1
+
+    def finish(self) -> LintResult:
+        self._flush_stray()
+        parser = self.parser
+        committed = len(parser.slices)
+        parser.finish()
+        if len(parser.slices) > committed:
+            self._text_done(parser.slices[-1])
+        self.result.lines = parser.line_count
+        if self.outside is not None:
+            first, last, n = self.outside
+            where = "no text starts" if not parser.slices else "the first text"
+            self.result.counts["before_first_text"] = 1
+            self.result.diagnostics.append(Diagnostic("before_first_text", first + 1, last + 1,
+                                                      f"{n} non-blank lines before {where}; they are not written to any output"))
+        self.result.diagnostics.sort(key=lambda d: d.first_line)
+        return self.result
+
+
+def _records(input_path: str, encoding: Optional[str], member: Optional[str]) -> Tuple[Iterator[MarkerRecord], str]:
+    enc = encoding or sniff_encoding(input_path, member)[0]
+    if is_ascii_compatible(enc):
+        return tokenize_file(input_path, enc, member=member), enc
+    # e.g. UTF-16: no line streaming, decode the whole file instead
+    lines, _newline_style, enc = read_text_preserve(input_path, encoding=encoding, member=member)
+    return tokenize_lines(lines), enc
+
+
+def lint_file(input_path: str, cfg: MarkerConfig, strict: bool = True, encoding: Optional[str] = None,
+              member: Optional[str] = None, max_per_kind: int = 20) -> LintResult:
+    """
+    Check an SFM input in one streamed pass without writing anything. Every
+    diagnostic is counted; only the first max_per_kind of each kind are kept.
+    """
+    records, enc = _records(input_path, encoding, member)
+    linter = _Linter(cfg, strict, max_per_kind)
+    for rec in records:
+        linter.feed(rec)
+    result = linter.finish()
+    result.encoding = enc
+    return result
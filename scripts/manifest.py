@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+MANIFEST_NAME = "sfm-split-manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    path: str  # relative to the output folder, '/'-separated
+    start_line: int
+    end_line: int  # inclusive index, like TextSlice.end
+    title: Optional[str] = None
+    id_value: Optional[str] = None
+    seq_no: Optional[str] = None
+    authors: List[str] = field(default_factory=list)
+    sha256: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    # Byte range in the source file; filled in once known (end excludes the line terminator)
+    source_start: Optional[int] = None
+    source_end: Optional[int] = None
+    # Set for duplicate texts: path of the first copy (path is "" if the duplicate was skipped),
+    # relative to the output folder ("/"-separated, may start with "../" for another zip member's
+    # folder), or absolute when the first copy was written by an earlier run (--dup-index)
+    duplicate_of: Optional[str] = None
+
+
+@dataclass
+class Manifest:
+    source: str
+    source_size: int
+    source_mtime_ns: int
+    input_encoding: str
+    output_encoding: str
+    newline: str
+    strict: bool
+    entries: List[ManifestEntry] = field(default_factory=list)
+    # Result of the last verify run that streamed the source:
+    # {"source_size": int, "source_mtime_ns": int, "findings": [...]}
+    verified: Optional[Dict[str, Any]] = None
+    # Codec error policy used when writing outputs
+    output_errors: str = "strict"
+    # Zip member that was split, when the source is an archive
+    source_member: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["version"] = MANIFEST_VERSION
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Manifest":
+        known = {f.name for f in fields(ManifestEntry)}
+        entries = [ManifestEntry(**{k: v for k, v in e.items() if k in known}) for e in data.get("entries") or []]
+        return cls(
+            source=data.get("source", ""),
+            source_size=int(data.get("source_size", 0)),
+            source_mtime_ns=int(data.get("source_mtime_ns", 0)),
+            input_encoding=data.get("input_encoding", "utf-8"),
+            output_encoding=data.get("output_encoding", data.get("input_encoding", "utf-8")),
+            newline=data.get("newline", "\n"),
+            strict=bool(data.get("strict", True)),
+            entries=entries,
+            verified=data.get("verified"),
+            output_errors=data.get("output_errors", "strict"),
+            source_member=data.get("source_member"),
+        )
+
+
+def manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+
+def load_manifest(output_dir: str) -> Optional[Manifest]:
+    try:
+        with open(manifest_path(output_dir), 'r', encoding='utf-8') as f:
+            return Manifest.from_json(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(output_dir: str, manifest: Manifest) -> None:
+    path = manifest_path(output_dir)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest.to_json(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
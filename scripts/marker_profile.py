@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import math
+import os
+import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.marker_config import MarkerConfig
+    from scripts.sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+    from scripts.io_utils import detect_compression, is_ascii_compatible, iter_raw_lines, read_text_preserve, sniff_encoding
+except Exception:
+    try:
+        from marker_config import MarkerConfig
+        from sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+        from io_utils import detect_compression, is_ascii_compatible, iter_raw_lines, read_text_preserve, sniff_encoding
+    except Exception:
+        from .marker_config import MarkerConfig
+        from .sfm_tokenizer import MarkerRecord, tokenize_file, tokenize_lines
+        from .io_utils import detect_compression, is_ascii_compatible, iter_raw_lines, read_text_preserve, sniff_encoding
+
+DEFAULT_SAMPLE_BLOCKS = 64
+DEFAULT_BLOCK_SIZE = 256 * 1024
+# Count ratio between neighbouring markers (by frequency) that separates content tiers from headers
+TIER_GAP = 2.0
+# z for a 95% margin of error
+Z_95 = 1.96
+
+
+@dataclass
+class MarkerStats:
+    marker: str
+    count: int = 0  # occurrences in the data read
+    estimate: float = 0.0  # estimated occurrences in the whole input
+    error: float = 0.0  # 95% margin of the estimate; 0 after a full scan
+    follows: Dict[str, int] = field(default_factory=dict)  # markers seen right after this one
+    header_opens: int = 0  # times it was the first non-content marker after content
+    text_share: float = 0.0  # fraction of the complete texts read that contain it
+    role: str = "metadata"  # "start", "metadata" or "content"
+
+
+@dataclass
+class MarkerProfile:
+    source: str
+    size: int
+    encoding: str
+    sampled: bool
+    bytes_read: int = 0
+    blocks: int = 0  # random blocks used for the estimates (0 after a full scan)
+    records: int = 0
+    texts_seen: int = 0  # complete texts read, for text_share
+    est_texts: float = 0.0
+    est_texts_error: float = 0.0
+    markers: Dict[str, MarkerStats] = field(default_factory=dict)
+    notes: List[str] = field(default_factory=list)
+
+    def by_role(self, role: str) -> List[str]:
+        return sorted(m for m, st in self.markers.items() if st.role == role)
+
+    def suggest_config(self) -> MarkerConfig:
+        """MarkerConfig from the inferred roles; start markers are also metadata, as in the defaults."""
+        cfg = MarkerConfig()
+        starts = set(self.by_role("start"))
+        cfg.start_markers = starts
+        cfg.metadata_markers = starts | set(self.by_role("metadata"))
+        cfg.content_markers = set(self.by_role("content"))
+        return cfg
+
+
+def config_to_json(cfg: MarkerConfig) -> Dict[str, object]:
+    """Inverse of MarkerConfig.from_json()."""
+    return {
+        "start_markers": sorted(cfg.start_markers),
+        "metadata_markers": sorted(cfg.metadata_markers),
+        "content_markers": sorted(cfg.content_markers),
+        "title_priority": list(cfg.title_priority),
+        "join_authors_with": cfg.join_authors_with,
+    }
+
+
+class _Sequences:
+    """Marker codes per block, as compact arrays of small ints."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.blocks: List[array] = []
+
+    def add_block(self, records: Iterable[MarkerRecord]) -> array:
+        seq = array('H')
+        for rec in records:
+            if rec.marker is None:
+                continue
+            code = self.codes.get(rec.marker)
+            if code is None:
+                code = self.codes[rec.marker] = len(self.names)
+                self.names.append(rec.marker)
+            seq.append(code)
+        self.blocks.append(seq)
+        return seq
+
+
+def _read_block(path: str, start: int, end: int, encoding: str) -> Tuple[List[str], int]:
+    """Decoded lines that begin inside [start, end), and the bytes they span."""
+    lines: List[str] = []
+    first = last = None
+    with open(path, 'rb') as fb:
+        fb.seek(start - 1 if start else 0)
+        it = iter_raw_lines(fb, 1 << 16, start - 1 if start else 0)
+        if start:
+            # The rest of the line that began before this block belongs to the previous one
+            next(it, None)
+        for offset, raw, term in it:
+            if offset >= end:
+                break
+            if first is None:
+                first = offset
+            last = offset + len(raw) + len(term)
+            lines.append(raw.decode(encoding, errors='replace'))
+    if lines and not start and lines[0].startswith("\ufeff"):
+        lines[0] = lines[0][1:]
+    return lines, (last - first) if first is not None else 0
+
+
+def _margin(per_block: List[int], total_slots: int) -> Tuple[float, float]:
+    """Estimate of a total from per-block counts of a simple random sample of blocks, with its 95% margin."""
+    k = len(per_block)
+    mean = sum(per_block) / k
+    if k < 2:
+        return total_slots * mean, float("inf")
+    var = sum((x - mean) ** 2 for x in per_block) / (k - 1)
+    fpc = (total_slots - k) / total_slots if total_slots > k else 0.0
+    return total_slots * mean, Z_95 * total_slots * math.sqrt(var / k * fpc)
+
+
+def _text_opens(seq: array, starts: Set[int], content: Set[int]) -> int:
+    """Texts opened in a block: the first start marker after content (or after any other marker without content roles)."""
+    n = 0
+    opened = False
+    for code in seq:
+        if code in starts:
+            if not opened:
+                n += 1
+                opened = True
+        elif code in content or not content:
+            opened = False
+    return n
+
+
+def _classify(profile: MarkerProfile, seqs: _Sequences, head: Optional[array]) -> None:
+    stats = profile.markers
+    names = seqs.names
+    ranked = sorted((st for st in stats.values() if st.count >= 2), key=lambda st: -st.count)
+    content: Set[str] = set()
+    # Content tiers repeat within every text: they sit above the first big drop in frequency
+    for hi, lo in zip(ranked, ranked[1:]):
+        content.add(hi.marker)
+        if hi.count >= TIER_GAP * lo.count:
+            break
+    else:
+        content = set()
+    if not content:
+        # Every marker about as frequent as the others (e.g. one content line per text)
+        first = names[head[0]] if head else (ranked[0].marker if ranked else None)
+        defaults = MarkerConfig().metadata_markers
+        for st in stats.values():
+            st.role = "start" if st.marker == first else ("metadata" if st.marker in defaults else "content")
+        profile.notes.append("No frequency gap between content and header markers; "
+                             "the first marker starts texts and the built-in metadata markers are kept.")
+        return
+
+    # Less frequent markers found between two content markers are content too (notes, comments, ...)
+    embedded: Dict[str, int] = {}
+    for seq in seqs.blocks:
+        for j in range(1, len(seq) - 1):
+            m = names[seq[j]]
+            if m not in content and names[seq[j - 1]] in content and names[seq[j + 1]] in content:
+                embedded[m] = embedded.get(m, 0) + 1
+    for m, n in embedded.items():
+        if n * 2 >= stats[m].count:
+            content.add(m)
+
+    # A text starts where a header marker follows content (or at the top of the file)
+    for seq in seqs.blocks:
+        for j in range(1, len(seq)):
+            m = names[seq[j]]
+            if m not in content and names[seq[j - 1]] in content:
+                stats[m].header_opens += 1
+    if head:
+        m = names[head[0]]
+        if m not in content:
+            stats[m].header_opens += 1
+    lead = max((st for st in stats.values() if st.marker not in content), key=lambda st: st.header_opens, default=None)
+    for st in stats.values():
+        if st.marker in content:
+            st.role = "content"
+        elif lead is not None and lead.header_opens and st.header_opens * 10 >= lead.header_opens:
+            st.role = "start"
+        else:
+            st.role = "metadata"
+
+
+def _text_shares(profile: MarkerProfile, seqs: _Sequences, full: bool) -> None:
+    """Share of texts containing each marker, from texts read from start to end."""
+    names = seqs.names
+    starts = {seqs.codes[m] for m in profile.by_role("start")}
+    content = {seqs.codes[m] for m in profile.by_role("content")}
+    present: Dict[int, int] = {}
+    texts = 0
+    for seq in seqs.blocks:
+        # A sampled block starts and ends inside texts: only count texts read from their start
+        cur: Optional[Set[int]] = set() if full else None
+        seen_content = False
+        for code in seq:
+            if code in starts and seen_content:
+                if cur is not None:
+                    texts += 1
+                    for c in cur:
+                        present[c] = present.get(c, 0) + 1
+                cur, seen_content = set(), False
+            if cur is not None:
+                cur.add(code)
+            if code in content:
+                seen_content = True
+        if full and cur:
+            texts += 1
+            for c in cur:
+                present[c] = present.get(c, 0) + 1
+    profile.texts_seen = texts
+    if texts:
+        for code, n in present.items():
+            profile.markers[names[code]].text_share = n / texts
+
+
+def profile_markers(input_path: str, encoding: Optional[str] = None, sample_blocks: int = DEFAULT_SAMPLE_BLOCKS,
+                    block_size: int = DEFAULT_BLOCK_SIZE, full: bool = False, seed: Optional[int] = None,
+                    member: Optional[str] = None) -> MarkerProfile:
+    """
+    Marker frequencies, followers and inferred roles for an SFM input.
+
+    Inputs larger than twice the sample budget are sampled: the first block plus
+    `sample_blocks` random, non-overlapping, line-aligned blocks; counts are scaled
+    up with a 95% margin of error. Compressed input and encodings that cannot be
+    split on raw newlines (UTF-16) are always scanned in full.
+    """
+    size = os.path.getsize(input_path)
+    # Only a head sample: detecting over the whole file would read every byte the sampling skips
+    enc = encoding or sniff_encoding(input_path, member)[0]
+    seekable = member is None and detect_compression(input_path) is None and is_ascii_compatible(enc)
+    total_slots = max(1, math.ceil(size / block_size))
+    sampled = seekable and not full and total_slots > 2 * sample_blocks
+    profile = MarkerProfile(source=os.path.abspath(input_path), size=size, encoding=enc, sampled=sampled)
+    seqs = _Sequences()
+
+    if not sampled:
+        if is_ascii_compatible(enc):
+            records = tokenize_file(input_path, enc, member=member)
+        else:
+            lines, _newline_style, enc = read_text_preserve(input_path, encoding=encoding, member=member)
+            records = tokenize_lines(lines)
+        head = seqs.add_block(records)
+        profile.bytes_read = size
+        for code in head:
+            m = seqs.names[code]
+            st = profile.markers.get(m)
+            if st is None:
+                st = profile.markers[m] = MarkerStats(m)
+            st.count += 1
+        for j in range(len(head) - 1):
+            follows = profile.markers[seqs.names[head[j]]].follows
+            nxt = seqs.names[head[j + 1]]
+            follows[nxt] = follows.get(nxt, 0) + 1
+        for st in profile.markers.values():
+            st.estimate = float(st.count)
+        profile.records = len(head)
+    else:
+        rng = random.Random(seed)
+        slots = sorted(rng.sample(range(1, total_slots), sample_blocks))
+        per_block: List[Dict[str, int]] = []
+        head = None
+        for slot in [0] + slots:
+            start = slot * block_size
+            lines, nbytes = _read_block(input_path, start, min(size, start + block_size), enc)
+            profile.bytes_read += nbytes
+            seq = seqs.add_block(tokenize_lines(lines))
+            counts: Dict[str, int] = {}
+            for j, code in enumerate(seq):
+                m = seqs.names[code]
+                counts[m] = counts.get(m, 0) + 1
+                if j + 1 < len(seq):
+                    follows = profile.markers.setdefault(m, MarkerStats(m)).follows
+                    nxt = seqs.names[seq[j + 1]]
+                    follows[nxt] = follows.get(nxt, 0) + 1
+            for m, n in counts.items():
+                profile.markers.setdefault(m, MarkerStats(m)).count += n
+            profile.records += len(seq)
+            if slot == 0:
+                # The top of the file shows how texts begin, but is no random draw
+                head = seq
+            else:
+                per_block.append(counts)
+        profile.blocks = len(per_block)
+        for m, st in profile.markers.items():
+            st.estimate, st.error = _margin([c.get(m, 0) for c in per_block], total_slots)
+
+    _classify(profile, seqs, head)
+    _text_shares(profile, seqs, full=not sampled)
+
+    # Estimate the number of texts the same way as marker counts
+    starts = {seqs.codes[m] for m in profile.by_role("start")}
+    content = {seqs.codes[m] for m in profile.by_role("content")}
+    if not sampled:
+        profile.est_texts = float(_text_opens(head, starts, content))
+    else:
+        per_block = [_text_opens(seq, starts, content) for seq in seqs.blocks[1:]]
+        profile.est_texts, profile.est_texts_error = _margin(per_block, total_slots)
+    return profile
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import codecs
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.io_utils import detect_encoding, detect_newline_style_bytes, is_ascii_compatible
+    from scripts.manifest import MANIFEST_NAME, Manifest, load_manifest
+    from scripts.duplicates import DUPLICATES_REPORT_NAME
+except Exception:
+    try:
+        from io_utils import detect_encoding, detect_newline_style_bytes, is_ascii_compatible
+        from manifest import MANIFEST_NAME, Manifest, load_manifest
+        from duplicates import DUPLICATES_REPORT_NAME
+    except Exception:
+        from .io_utils import detect_encoding, detect_newline_style_bytes, is_ascii_compatible
+        from .manifest import MANIFEST_NAME, Manifest, load_manifest
+        from .duplicates import DUPLICATES_REPORT_NAME
+
+MERGE_ORDERS = ("manifest", "name")
+NEWLINE_STYLES = {"lf": "\n", "crlf": "\r\n", "cr": "\r"}
+# Files written next to the outputs that are never merged
+SIDECAR_NAMES = {MANIFEST_NAME, MANIFEST_NAME + ".tmp", DUPLICATES_REPORT_NAME}
+COPY_CHUNK = 1 << 20
+NEWLINE_SAMPLE_BYTES = 64 * 1024
+
+
+@dataclass
+class MergeResult:
+    files: int = 0
+    bytes_written: int = 0
+    encoding: str = ""
+    newline: str = "\n"
+    zero_copy: bool = False  # source and target encodings matched, files were copied as bytes
+    methods: Dict[str, int] = field(default_factory=dict)  # files per copy method
+
+
+def list_merge_files(folder: str, order: Optional[str] = None, ext: Optional[str] = None,
+                     exclude: Optional[str] = None) -> Tuple[List[str], Optional[Manifest]]:
+    """
+    Files to merge, in order. "manifest" follows the source order recorded by the split
+    (skipped duplicates are filled in from their first copy); "name" sorts relative paths.
+    Without an order the manifest is used when there is one.
+    """
+    manifest = load_manifest(folder)
+    if order is None:
+        order = "manifest" if manifest is not None else "name"
+    if order == "manifest":
+        if manifest is None:
+            raise ValueError(f"No {MANIFEST_NAME} in {folder}; merge in name order instead.")
+        paths = []
+        for e in sorted(manifest.entries, key=lambda e: e.start_line):
+            if e.path:
+                paths.append(os.path.join(folder, *e.path.split("/")))
+            elif e.duplicate_of:
+                dup = e.duplicate_of
+                paths.append(dup if os.path.isabs(dup) else os.path.join(folder, *dup.split("/")))
+        return paths, manifest
+
+    exclude_abs = os.path.abspath(exclude) if exclude else None
+    found: List[Tuple[str, str]] = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in files:
+            if name in SIDECAR_NAMES or name.endswith(".tmp"):
+                continue
+            if ext and not name.lower().endswith(ext.lower()):
+                continue
+            path = os.path.join(root, name)
+            if exclude_abs and os.path.abspath(path) == exclude_abs:
+                continue
+            found.append((os.path.relpath(path, folder).replace(os.sep, "/"), path))
+    found.sort()
+    return [path for _rel, path in found], manifest
+
+
+def unchanged_outputs(folder: str, manifest: Optional[Manifest]) -> Set[str]:
+    """Absolute paths of outputs whose size and mtime still match the manifest, i.e. untouched split output."""
+    unchanged: Set[str] = set()
+    if manifest is None:
+        return unchanged
+    for e in manifest.entries:
+        if not e.path or e.duplicate_of:
+            continue
+        path = os.path.join(folder, *e.path.split("/"))
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size == e.size and st.st_mtime_ns == e.mtime_ns:
+            unchanged.add(os.path.abspath(path))
+    return unchanged
+
+
+def _split_terminator(text: str) -> Tuple[str, str]:
+    """Split a trailing line terminator (CRLF, LF or a lone CR) off text."""
+    if text.endswith("\r\n"):
+        return text[:-2], text[-2:]
+    if text.endswith(("\n", "\r")):
+        return text[:-1], text[-1:]
+    return text, ""
+
+
+def detect_join_newline(paths: List[str], encoding: str) -> str:
+    """Newline style of the first files that contain a line break."""
+    for path in paths:
+        with open(path, 'rb') as f:
+            sample = f.read(NEWLINE_SAMPLE_BYTES)
+        if not is_ascii_compatible(encoding):
+            # e.g. UTF-16: CR and LF are not single bytes, look at them as UTF-8
+            sample = sample.decode(encoding, errors='replace').encode('utf-8')
+        if b"\n" in sample or b"\r" in sample:
+            return detect_newline_style_bytes(sample)
+    return "\n"
+
+
+def _write_all(out: BinaryIO, data: bytes) -> None:
+    # Unbuffered writes may be partial
+    view = memoryview(data)
+    while view:
+        n = out.write(view)
+        view = view[n:]
+
+
+class _Copier:
+    """Byte-range copies into one output, kernel-side when the platform allows it."""
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.use_copy_file_range = hasattr(os, "copy_file_range")
+        # sendfile() to a regular file only works on Linux
+        self.use_sendfile = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+    def copy(self, src: BinaryIO, offset: int, count: int) -> str:
+        """Append count bytes of src starting at offset; returns the method that finished the copy."""
+        src_fd, dst_fd = src.fileno(), self.out.fileno()
+        done = 0
+        if self.use_copy_file_range and count:
+            try:
+                while done < count:
+                    n = os.copy_file_range(src_fd, dst_fd, count - done, offset + done)
+                    if not n:
+                        break
+                    done += n
+                if done == count:
+                    return "copy_file_range"
+            except OSError:
+                # e.g. EXDEV across file systems on older kernels, or unsupported file system
+                self.use_copy_file_range = False
+        if self.use_sendfile and done < count:
+            try:
+                while done < count:
+                    n = os.sendfile(dst_fd, src_fd, offset + done, count - done)
+                    if not n:
+                        break
+                    done += n
+                if done == count:
+                    return "sendfile"
+            except OSError:
+                self.use_sendfile = False
+        src.seek(offset + done)
+        while done < count:
+            chunk = src.read(min(COPY_CHUNK, count - done))
+            if not chunk:
+                break
+            _write_all(self.out, chunk)
+            done += len(chunk)
+        return "buffered"
+
+
+def merge_files(paths: List[str], out_path: str, encoding: str, out_encoding: Optional[str] = None,
+                newline: Optional[str] = None, errors: str = "strict", overwrite: bool = False,
+                unchanged: Optional[Set[str]] = None) -> MergeResult:
+    """
+    Concatenate paths into out_path, each text ending in exactly one joining newline.
+    A line terminator at the end of a file is replaced by it, except for files in
+    `unchanged` (absolute paths of untouched split outputs, see unchanged_outputs()):
+    a split writes texts without a final newline, so a terminator there is a blank
+    line of the text and is kept. Byte order marks inside the files are dropped; a
+    BOM-writing output encoding still starts with one. With matching ASCII-compatible
+    encodings the bytes are copied unchanged (copy_file_range, then sendfile, then
+    buffered reads); otherwise every file is decoded and re-encoded in chunks.
+    """
+    out_encoding = out_encoding or encoding
+    unchanged = unchanged or set()
+    result = MergeResult(encoding=out_encoding)
+    result.newline = newline or detect_join_newline(paths, encoding)
+    result.zero_copy = (codecs.lookup(encoding).name == codecs.lookup(out_encoding).name
+                        and is_ascii_compatible(encoding))
+    with open(out_path, 'wb' if overwrite else 'xb', buffering=0) as out:
+        if result.zero_copy:
+            copier = _Copier(out)
+            sep = result.newline.encode(encoding)
+            strip_bom = codecs.lookup(encoding).name == "utf-8"
+            for path in paths:
+                with open(path, 'rb') as src:
+                    size = os.fstat(src.fileno()).st_size
+                    start = 3 if strip_bom and src.read(3) == codecs.BOM_UTF8 else 0
+                    end = size
+                    if os.path.abspath(path) not in unchanged:
+                        src.seek(max(start, size - 2))
+                        end -= len(_split_terminator(src.read().decode("latin-1"))[1])
+                    method = copier.copy(src, start, end - start)
+                _write_all(out, sep)
+                result.methods[method] = result.methods.get(method, 0) + 1
+                result.files += 1
+        else:
+            encoder = codecs.getincrementalencoder(out_encoding)(errors)
+            for path in paths:
+                decoder = codecs.getincrementaldecoder(encoding)()
+                keep_final = os.path.abspath(path) in unchanged
+                at_start = True
+                held = ""  # possible final terminator, written once more text follows
+                with open(path, 'rb') as src:
+                    while True:
+                        chunk = src.read(COPY_CHUNK)
+                        text = decoder.decode(chunk, final=not chunk)
+                        if at_start and text:
+                            if text.startswith("\ufeff"):
+                                text = text[1:]
+                            at_start = False
+                        if text:
+                            text, tail = _split_terminator(held + text)
+                            _write_all(out, encoder.encode(text))
+                            held = tail
+                        if not chunk:
+                            break
+                _write_all(out, encoder.encode((held if keep_final else "") + result.newline))
+                result.methods["transcoded"] = result.methods.get("transcoded", 0) + 1
+                result.files += 1
+            _write_all(out, encoder.encode("", final=True))
+        result.bytes_written = os.fstat(out.fileno()).st_size
+    return result
+
+
+def source_encoding(paths: List[str], manifest: Optional[Manifest], encoding: Optional[str] = None) -> str:
+    """Encoding of the files: given, recorded by the split, or detected on the first file."""
+    if encoding:
+        return encoding
+    if manifest is not None:
+        return manifest.output_encoding
+    return detect_encoding(paths[0])[0] if paths else "utf-8"
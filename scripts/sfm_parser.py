@@ -1,20 +1,21 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import re
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 # Robust import so it works under PyInstaller, module, and script modes
 try:
     from scripts.marker_config import MarkerConfig
+    from scripts.sfm_tokenizer import MarkerRecord, tokenize_lines
 except Exception:
     try:
         from marker_config import MarkerConfig
+        from sfm_tokenizer import MarkerRecord, tokenize_lines
     except Exception:
         from .marker_config import MarkerConfig
-
-_marker_re = re.compile(r"^\\([A-Za-z0-9]+)(?:\s+|$)")
+        from .sfm_tokenizer import MarkerRecord, tokenize_lines
 
 
 @dataclass
@@ -25,119 +26,192 @@ class TextSlice:
     authors: List[str]
     id_value: Optional[str]
     seq_no: Optional[str]
+    # Source byte range (end excludes the final line terminator); set when tokenized from a file
+    byte_start: Optional[int] = None
+    byte_end: Optional[int] = None
 
 
-def parse_and_split(lines: list[str], cfg: MarkerConfig, strict: bool = True) -> Tuple[List[TextSlice], List[str]]:
+class SliceParser:
     """
-    Split input lines into texts using marker-based boundaries.
-    Returns (slices, warnings).
+    Boundary state machine behind parse_and_split().
+    Feed it MarkerRecords from the tokenizer, then call finish(); several parsers
+    can consume the same record stream (e.g. to compare configurations).
     """
-    warnings: List[str] = []
-    slices: List[TextSlice] = []
-
-    in_text = False
-    seen_content = False
-    current_start = None  # type: Optional[int]
 
-    # metadata gathered for current text
-    cur_title: Optional[str] = None
-    cur_authors: List[str] = []
-    cur_id: Optional[str] = None
-    cur_seq: Optional[str] = None
-
-    last_marker: Optional[str] = None
-
-    def commit_slice(end_idx: int):
-        nonlocal cur_title, cur_authors, cur_id, cur_seq
-        if current_start is None:
+    def __init__(self, cfg: MarkerConfig, strict: bool = True):
+        self.cfg = cfg
+        self.strict = strict
+        self.slices: List[TextSlice] = []
+        self.in_text = False
+        self.seen_content = False
+        self.current_start = None  # type: Optional[int]
+        self.current_byte_start = None  # type: Optional[int]
+        # metadata gathered for current text
+        self.cur_title: Optional[str] = None
+        self.cur_authors: List[str] = []
+        self.cur_id: Optional[str] = None
+        self.cur_seq: Optional[str] = None
+        self.last_marker: Optional[str] = None
+        self.line_count = 0
+        self.last_byte_end = None  # type: Optional[int]
+
+    def _commit_slice(self, end_idx: int) -> None:
+        if self.current_start is None:
             return
-        slices.append(TextSlice(
-            start=current_start,
+        self.slices.append(TextSlice(
+            start=self.current_start,
             end=end_idx,
-            title=cur_title,
-            authors=cur_authors.copy(),
-            id_value=cur_id,
-            seq_no=cur_seq,
+            title=self.cur_title,
+            authors=self.cur_authors.copy(),
+            id_value=self.cur_id,
+            seq_no=self.cur_seq,
+            byte_start=self.current_byte_start,
+            byte_end=self.last_byte_end,
         ))
         # reset for next
-        cur_title = None
-        cur_authors.clear()
-        cur_id = None
-        cur_seq = None
-
-    for i, line in enumerate(lines):
-        m = _marker_re.match(line)
-        code = m.group(1).lower() if m else None
-
+        self.cur_title = None
+        self.cur_authors.clear()
+        self.cur_id = None
+        self.cur_seq = None
+
+    def _start_text(self, i: int, rec: MarkerRecord, seen_content: bool) -> None:
+        self.in_text = True
+        self.seen_content = seen_content
+        self.current_start = i
+        span = rec.line_span(i)
+        self.current_byte_start = span[0] if span else None
+
+    def _capture(self, code: str, rec: MarkerRecord) -> None:
+        cfg = self.cfg
+        if code in ("t", "te"):
+            # Title could be on the same line after a space
+            text = rec.head
+            # Prefer priority order: keep first preferred
+            if self.cur_title is None:
+                self.cur_title = text if text else self.cur_title
+            else:
+                # if we have t but te not set and current is t, allow upgrade
+                if code == cfg.title_priority[0] and self.cur_title:
+                    # upgrade to te if present
+                    self.cur_title = text or self.cur_title
+        elif code == "a":
+            text = rec.head
+            if text:
+                self.cur_authors.append(text)
+        elif code == "id":
+            self.cur_id = (rec.head or self.cur_id)
+        elif code == "no":
+            self.cur_seq = (rec.head or self.cur_seq)
+
+    def _unmarked_line(self, i: int, rec: MarkerRecord) -> None:
+        # Non-marker line: treat as continuation of previous marker or as content
+        cfg = self.cfg
+        last_marker = self.last_marker
+        if self.in_text and last_marker:
+            # continuation; if last_marker was content, mark seen_content
+            if cfg.is_content_marker(last_marker) or (last_marker not in cfg.metadata_markers and last_marker not in cfg.start_markers):
+                self.seen_content = True
+        elif not self.in_text and not self.strict:
+            self._start_text(i, rec, seen_content=True)
+
+    def feed_record(self, rec: MarkerRecord) -> None:
+        """Process one record: its marker line, then its continuation lines."""
+        cfg = self.cfg
+        i = rec.first_line
+        code = rec.marker
         if code:
-            last_marker = code
+            self.last_marker = code
             is_start = cfg.is_start_marker(code)
             is_meta = cfg.is_metadata_marker(code)
             is_content = cfg.is_content_marker(code) or (not is_meta and not is_start)
 
-            # capture metadata values
-            if code in ("t", "te"):
-                # Title could be on the same line after a space
-                text = line[m.end():].strip()
-                # Prefer priority order: keep first preferred
-                if cur_title is None:
-                    cur_title = text if text else cur_title
-                else:
-                    # if we have t but te not set and current is t, allow upgrade
-                    if code == cfg.title_priority[0] and cur_title:
-                        # upgrade to te if present
-                        cur_title = text or cur_title
-            elif code == "a":
-                text = line[m.end():].strip()
-                if text:
-                    cur_authors.append(text)
-            elif code == "id":
-                cur_id = (line[m.end():].strip() or cur_id)
-            elif code == "no":
-                cur_seq = (line[m.end():].strip() or cur_seq)
-
             if is_start:
-                if not in_text:
+                if not self.in_text:
                     # Start a new text at this marker
-                    in_text = True
-                    seen_content = False
-                    current_start = i
-                else:
+                    self._start_text(i, rec, seen_content=False)
+                elif self.seen_content:
                     # inside metadata of current text; if we've seen content, this starts a new text
-                    if seen_content:
-                        commit_slice(i - 1)
-                        in_text = True
-                        seen_content = False
-                        current_start = i
-                        # metadata for next will be (re)captured automatically
-                continue
-
-            if is_content:
-                if in_text:
-                    seen_content = True
-                else:
+                    self._commit_slice(i - 1)
+                    self._start_text(i, rec, seen_content=False)
+            elif is_content:
+                if self.in_text:
+                    self.seen_content = True
+                elif not self.strict:
                     # Strict: ignore content before first text; Loose: treat as start
-                    if not strict:
-                        in_text = True
-                        seen_content = True
-                        current_start = i
-                continue
+                    self._start_text(i, rec, seen_content=True)
+            # capture metadata after the boundary decision so it lands in the text it opens
+            self._capture(code, rec)
         else:
-            # Non-marker line: treat as continuation of previous marker or as content
-            if in_text and last_marker:
-                # continuation; if last_marker was content, mark seen_content
-                if cfg.is_content_marker(last_marker) or (last_marker not in cfg.metadata_markers and last_marker not in cfg.start_markers):
-                    seen_content = True
-            elif not in_text and not strict:
-                in_text = True
-                seen_content = True
-                current_start = i
-            continue
-
-    # commit last slice
-    if in_text and current_start is not None:
-        commit_slice(len(lines) - 1)
-
-    if not slices:
-        warnings.append("No texts detected with current marker configuration.")
-    return slices, warnings
+            self._unmarked_line(i, rec)
+
+        # Continuation lines: after the first one the state no longer changes
+        if rec.last_line > i:
+            self._unmarked_line(i + 1, rec)
+        self.line_count = rec.last_line + 1
+        self.last_byte_end = rec.byte_end
+
+    def finish(self, line_count: Optional[int] = None) -> Tuple[List[TextSlice], List[str]]:
+        """Commit the last text and return (slices, warnings)."""
+        warnings: List[str] = []
+        if line_count is None:
+            line_count = self.line_count
+        if self.in_text and self.current_start is not None:
+            self._commit_slice(line_count - 1)
+            self.in_text = False
+        if not self.slices:
+            warnings.append("No texts detected with current marker configuration.")
+        return self.slices, warnings
+
+
+def split_records(records: Iterable[MarkerRecord], cfg: MarkerConfig, strict: bool = True) -> Tuple[List[TextSlice], List[str]]:
+    """Like parse_and_split(), but over a record stream (e.g. tokenize_file())."""
+    parser = SliceParser(cfg, strict=strict)
+    for rec in records:
+        parser.feed_record(rec)
+    return parser.finish()
+
+
+def iter_text_slices(records: Iterable[MarkerRecord], cfg: MarkerConfig, strict: bool = True) -> Iterator[Tuple[TextSlice, List[str]]]:
+    """
+    Yield (slice, lines) as soon as each text is complete, keeping only the
+    records of the text in progress in memory. Stop iterating to stop reading.
+    """
+    parser = SliceParser(cfg, strict=strict)
+    pending: "deque[MarkerRecord]" = deque()
+
+    def slice_lines(sl: TextSlice) -> List[str]:
+        out: List[str] = []
+        for r in pending:
+            for i in range(max(r.first_line, sl.start), min(r.last_line, sl.end) + 1):
+                out.append(r.line(i))
+        return out
+
+    for rec in records:
+        committed = len(parser.slices)
+        parser.feed_record(rec)
+        if len(parser.slices) > committed:
+            sl = parser.slices[-1]
+            yield sl, slice_lines(sl)
+        pending.append(rec)
+        # Forget records that can no longer belong to a text
+        if not parser.in_text:
+            pending.clear()
+        else:
+            while pending and pending[0].last_line < parser.current_start:
+                pending.popleft()
+    committed = len(parser.slices)
+    parser.finish()
+    if len(parser.slices) > committed:
+        sl = parser.slices[-1]
+        yield sl, slice_lines(sl)
+
+
+def parse_and_split(lines: list[str], cfg: MarkerConfig, strict: bool = True) -> Tuple[List[TextSlice], List[str]]:
+    """
+    Split input lines into texts using marker-based boundaries.
+    Returns (slices, warnings).
+    """
+    parser = SliceParser(cfg, strict=strict)
+    for rec in tokenize_lines(lines):
+        parser.feed_record(rec)
+    return parser.finish(len(lines))
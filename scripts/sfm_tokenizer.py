@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.io_utils import iter_source_lines
+except Exception:
+    try:
+        from io_utils import iter_source_lines
+    except Exception:
+        from .io_utils import iter_source_lines
+
+_marker_re = re.compile(r"^\\([A-Za-z0-9]+)(?:\s+|$)")
+
+
+class MarkerRecord:
+    """
+    One SFM field: a marker line plus the unmarked continuation lines after it.
+
+    `marker` is the lowercased code (None for unmarked lines at the very start of
+    the input). Line numbers are 0-based and inclusive. Byte offsets are only
+    known when tokenizing a file (tokenize_file); they exclude line terminators.
+    The value strings are sliced out of the source lines on first access.
+    """
+
+    __slots__ = ("marker", "first_line", "last_line", "value_start", "byte_start", "byte_end",
+                 "_lines", "_base", "_spans", "_head", "_value")
+
+    def __init__(self, marker: Optional[str], first_line: int, value_start: int, lines: Sequence[str], base: int,
+                 spans: Optional[List[Tuple[int, int]]] = None):
+        self.marker = marker
+        self.first_line = first_line
+        self.last_line = first_line
+        self.value_start = value_start
+        self._lines = lines
+        self._base = base
+        self._spans = spans
+        self.byte_start = spans[0][0] if spans else None
+        self.byte_end = spans[0][1] if spans else None
+        self._head: Optional[str] = None
+        self._value: Optional[str] = None
+
+    @property
+    def line_count(self) -> int:
+        return self.last_line - self.first_line + 1
+
+    def line(self, index: int) -> str:
+        """Source text of line `index` (first_line <= index <= last_line)."""
+        return self._lines[index - self._base]
+
+    def line_span(self, index: int) -> Optional[Tuple[int, int]]:
+        """Byte range of line `index`, if known."""
+        if self._spans is None:
+            return None
+        return self._spans[index - self.first_line]
+
+    @property
+    def head(self) -> str:
+        """Value on the marker line only, stripped (what title/author/id capture uses)."""
+        if self._head is None:
+            self._head = self.line(self.first_line)[self.value_start:].strip()
+        return self._head
+
+    @property
+    def value(self) -> str:
+        """Full value including continuation lines, joined with newlines and stripped."""
+        if self._value is None:
+            if self.last_line == self.first_line:
+                self._value = self.head
+            else:
+                parts = [self.line(self.first_line)[self.value_start:]]
+                parts += [self.line(i) for i in range(self.first_line + 1, self.last_line + 1)]
+                self._value = "\n".join(parts).strip()
+        return self._value
+
+    def _extend(self, span: Optional[Tuple[int, int]]) -> None:
+        self.last_line += 1
+        if span is not None and self._spans is not None:
+            self._spans.append(span)
+            self.byte_end = span[1]
+
+    def __repr__(self) -> str:
+        return f"MarkerRecord({self.marker!r}, lines {self.first_line}-{self.last_line})"
+
+
+def tokenize_lines(lines: Sequence[str]) -> Iterator[MarkerRecord]:
+    """Stream records over already-decoded lines (e.g. from read_text_preserve())."""
+    rec: Optional[MarkerRecord] = None
+    match = _marker_re.match
+    for i, line in enumerate(lines):
+        m = match(line)
+        if m:
+            if rec is not None:
+                yield rec
+            rec = MarkerRecord(m.group(1).lower(), i, m.end(), lines, 0)
+        elif rec is None:
+            rec = MarkerRecord(None, i, 0, lines, 0)
+        else:
+            rec.last_line = i
+    if rec is not None:
+        yield rec
+
+
+def _tokenize_spanned(source: Iterable[Tuple[int, str, Tuple[int, int]]]) -> Iterator[MarkerRecord]:
+    rec: Optional[MarkerRecord] = None
+    match = _marker_re.match
+    for i, text, span in source:
+        m = match(text)
+        if m or rec is None:
+            if rec is not None:
+                yield rec
+            # Records keep only their own lines so memory stays bounded
+            rec = MarkerRecord(m.group(1).lower() if m else None, i, m.end() if m else 0, [text], i, [span])
+        else:
+            rec._lines.append(text)  # type: ignore[attr-defined]
+            rec._extend(span)
+    if rec is not None:
+        yield rec
+
+
+def tokenize_file(path: str, encoding: str, member: Optional[str] = None, errors: str = "replace") -> Iterator[MarkerRecord]:
+    """Stream records straight from a file, with byte offsets, without loading it whole."""
+    return _tokenize_spanned((ln.index, ln.text, (ln.start, ln.end))
+                             for ln in iter_source_lines(path, encoding, member=member, errors=errors))
@@ -2,10 +2,16 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import hashlib
 import json
+import math
 import os
+import re
 import sys
 import subprocess
+import zipfile
+from dataclasses import asdict, dataclass
 from typing import Optional
 
 # Tkinter optional (legacy UI)
@@ -28,27 +34,62 @@ try:
     # Preferred: import as a package (works in PyInstaller, and when run from repo root)
     from scripts.marker_config import MarkerConfig
     from scripts.sfm_parser import parse_and_split
-    from scripts.io_utils import read_text_preserve, write_lines_preserve
-    from scripts.filename_utils import make_filename, dedupe_filename
+    from scripts.io_utils import (DECOMPRESSION_ERRORS, CountingErrors, detect_compression, line_ranges_to_bytes, read_text_preserve,
+                                  sfm_members, write_lines_preserve)
+    from scripts.filename_utils import slice_filename, dedupe_filename, member_dirname, parse_layout, shard_path
+    from scripts.manifest import MANIFEST_NAME, Manifest, ManifestEntry, load_manifest, save_manifest
+    from scripts.extract import Selectors, index_matches_source, iter_indexed, iter_streamed, stream_texts
+    from scripts.verify import INFO_KINDS, verify_outputs
+    from scripts.compare import Candidate, compare_candidates
+    from scripts.sqlite_sink import SQLiteSink
+    from scripts.duplicates import DUPLICATES_REPORT_NAME, DuplicateHit, DuplicateIndex, content_key
+    from scripts.lint import lint_file
+    from scripts.marker_profile import DEFAULT_BLOCK_SIZE, DEFAULT_SAMPLE_BLOCKS, config_to_json, profile_markers
+    from scripts.merge import NEWLINE_STYLES, list_merge_files, merge_files, source_encoding, unchanged_outputs
 except Exception:
     try:
         # Fallback: same directory imports (when running directly from scripts folder)
         from marker_config import MarkerConfig
         from sfm_parser import parse_and_split
-        from io_utils import read_text_preserve, write_lines_preserve
-        from filename_utils import make_filename, dedupe_filename
+        from io_utils import (DECOMPRESSION_ERRORS, CountingErrors, detect_compression, line_ranges_to_bytes, read_text_preserve,
+                              sfm_members, write_lines_preserve)
+        from filename_utils import slice_filename, dedupe_filename, member_dirname, parse_layout, shard_path
+        from manifest import MANIFEST_NAME, Manifest, ManifestEntry, load_manifest, save_manifest
+        from extract import Selectors, index_matches_source, iter_indexed, iter_streamed, stream_texts
+        from verify import INFO_KINDS, verify_outputs
+        from compare import Candidate, compare_candidates
+        from sqlite_sink import SQLiteSink
+        from duplicates import DUPLICATES_REPORT_NAME, DuplicateHit, DuplicateIndex, content_key
+        from lint import lint_file
+        from marker_profile import DEFAULT_BLOCK_SIZE, DEFAULT_SAMPLE_BLOCKS, config_to_json, profile_markers
+        from merge import NEWLINE_STYLES, list_merge_files, merge_files, source_encoding, unchanged_outputs
     except Exception:
         # Last resort: relative imports when executed as module (python -m scripts.split_sfm)
         from .marker_config import MarkerConfig
         from .sfm_parser import parse_and_split
-        from .io_utils import read_text_preserve, write_lines_preserve
-        from .filename_utils import make_filename, dedupe_filename
+        from .io_utils import (DECOMPRESSION_ERRORS, CountingErrors, detect_compression, line_ranges_to_bytes, read_text_preserve,
+                               sfm_members, write_lines_preserve)
+        from .filename_utils import slice_filename, dedupe_filename, member_dirname, parse_layout, shard_path
+        from .manifest import MANIFEST_NAME, Manifest, ManifestEntry, load_manifest, save_manifest
+        from .extract import Selectors, index_matches_source, iter_indexed, iter_streamed, stream_texts
+        from .verify import INFO_KINDS, verify_outputs
+        from .compare import Candidate, compare_candidates
+        from .sqlite_sink import SQLiteSink
+        from .duplicates import DUPLICATES_REPORT_NAME, DuplicateHit, DuplicateIndex, content_key
+        from .lint import lint_file
+        from .marker_profile import DEFAULT_BLOCK_SIZE, DEFAULT_SAMPLE_BLOCKS, config_to_json, profile_markers
+        from .merge import NEWLINE_STYLES, list_merge_files, merge_files, source_encoding, unchanged_outputs
+
+
+MAX_FINDINGS_PER_KIND = 20
 
 
 def ensure_empty_dir(path: str) -> bool:
     if not os.path.isdir(path):
         return False
-    return len(os.listdir(path)) == 0
+    # Stop at the first entry instead of listing a possibly huge folder
+    with os.scandir(path) as it:
+        return next(it, None) is None
 
 
 def load_config(config_path: Optional[str]) -> MarkerConfig:
@@ -62,7 +103,207 @@ def load_config(config_path: Optional[str]) -> MarkerConfig:
         return MarkerConfig()
 
 
-def run_cli(input_path: Optional[str], output_dir: Optional[str], strict: bool, ext: str, encoding: Optional[str], config_path: Optional[str], headless: bool) -> int:
+@dataclass
+class SplitJob:
+    """Options and shared state of one split run, applied to each source (file or zip member)."""
+    cfg: MarkerConfig
+    strict: bool
+    ext: str
+    layout_name: str
+    layout_size: int
+    manifest: bool
+    input_encoding: Optional[str]
+    output_encoding: Optional[str]
+    encoding_errors: str
+    duplicates: str = "keep"
+    dups: Optional[DuplicateIndex] = None
+    sink: Optional[SQLiteSink] = None
+    texts_found: int = 0  # over all sources, including skipped duplicates
+
+    def split_source(self, input_path: str, output_dir: Optional[str], member: Optional[str] = None) -> tuple[int, int]:
+        """
+        Split one source into output_dir (None: only the SQLite sink).
+        Compressed inputs are streamed text by text; plain files are read whole.
+        Returns (exit code, texts written).
+        """
+        cfg = self.cfg
+        source_abs = os.path.abspath(input_path)
+        label = f"{member}: " if member else ""
+        source_label = f"{source_abs}!{member}" if member else source_abs
+        compressed = member is not None or detect_compression(input_path) is not None
+        # Count input bytes that do not decode (replaced with U+FFFD), e.g. a wrong --input-encoding
+        undecodable = CountingErrors.get("replace", "decode")
+        undecodable.count = 0
+        if compressed:
+            # Decompress on the fly; only the text in progress is held in memory
+            texts, newline_style, enc_detected = stream_texts(input_path, cfg, self.strict, encoding=self.input_encoding,
+                                                              member=member, errors=undecodable.name)
+            lines = slices = None
+        else:
+            # Read input preserving encoding/newlines
+            lines, newline_style, enc_detected = read_text_preserve(input_path, encoding=self.input_encoding, errors=undecodable.name)
+            # Split texts
+            slices, warnings = parse_and_split(lines, cfg, strict=self.strict)
+            for w in warnings:
+                print(f"WARN: {w}", file=sys.stderr)
+            if not slices:
+                return 5, 0
+            texts = ((sl, lines[sl.start:sl.end+1]) for sl in slices)
+        enc_to_use = self.output_encoding or enc_detected
+        encoding_errors = self.encoding_errors
+        # Count characters the output encoding cannot represent, per file
+        replaced = CountingErrors.get(encoding_errors)
+        replaced_files = 0
+        replaced_total = 0
+        manifest = self.manifest and bool(output_dir)
+        dups, sink, duplicates = self.dups, self.sink, self.duplicates
+        if sink is not None:
+            sink.source = source_label
+
+        # Write outputs
+        existing = set()
+        count = 0
+        found = 0
+        entries = []
+        for sl, text_lines in texts:
+            found += 1
+            # title from priority, authors joined with join_authors_with
+            fname = slice_filename(sl, cfg.join_authors_with, ext=self.ext)
+
+            key = first = first_ref = None
+            if dups is not None:
+                key = content_key(text_lines)
+                first = dups.lookup(key)
+                if first is not None and output_dir:
+                    # Copies written by this run are referenced relative to the output folder, so it
+                    # can be moved; copies from an earlier run (--dup-index) keep their absolute path
+                    first_ref = first["path"]
+                    if dups.added_this_run(key):
+                        first_ref = os.path.relpath(first_ref, output_dir).replace(os.sep, "/")
+                if first is not None and duplicates == "skip":
+                    dups.hits.append(DuplicateHit(fname, sl.start + 1, sl.end + 1, source_label, first["path"], first["source"], "skipped"))
+                    if manifest:
+                        entries.append(ManifestEntry(
+                            path="", start_line=sl.start, end_line=sl.end,
+                            title=sl.title, id_value=sl.id_value, seq_no=sl.seq_no, authors=list(sl.authors), duplicate_of=first_ref,
+                        ))
+                    continue
+
+            fname = dedupe_filename(fname, existing)
+            existing.add(fname)
+            if sink is not None:
+                sink.add(fname, newline_style.join(text_lines), sl.title, sl.authors, sl.id_value, sl.seq_no, sl.start, sl.end)
+            if output_dir:
+                rel_path = shard_path(fname, count, self.layout_name, self.layout_size)
+                out_path = os.path.join(output_dir, *rel_path.split("/"))
+                linked = False
+                if first is not None and duplicates == "link":
+                    try:
+                        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                        os.link(first["path"], out_path)
+                        linked = True
+                    except OSError:
+                        # different volume, no hard-link support, original gone: write a copy
+                        pass
+                hasher = hashlib.sha256() if manifest else None
+                if linked:
+                    if hasher is not None:
+                        with open(out_path, 'rb') as f:
+                            for chunk in iter(lambda: f.read(1 << 20), b""):
+                                hasher.update(chunk)
+                else:
+                    replaced.count = 0
+                    try:
+                        write_lines_preserve(out_path, text_lines, newline_style, enc_to_use, hasher=hasher, errors=replaced.name)
+                    except UnicodeEncodeError as e:
+                        try:
+                            os.remove(out_path)
+                        except OSError:
+                            pass
+                        print(f"ERROR: {label}{rel_path}: {enc_to_use} cannot encode {e.object[e.start:e.end]!r}; "
+                              f"choose another --output-encoding or --encoding-errors policy.", file=sys.stderr)
+                        return 7, count
+                    if replaced.count:
+                        replaced_files += 1
+                        replaced_total += replaced.count
+                        if replaced_files <= MAX_FINDINGS_PER_KIND:
+                            print(f"WARN: {label}{rel_path}: {replaced.count} characters not representable in {enc_to_use} ({encoding_errors})", file=sys.stderr)
+                if first is not None:
+                    dups.hits.append(DuplicateHit(fname, sl.start + 1, sl.end + 1, source_label, first["path"], first["source"],
+                                                  "linked" if linked else "written"))
+                elif key is not None:
+                    dups.add(key, source_label, os.path.abspath(out_path))
+                if manifest:
+                    st = os.stat(out_path)
+                    entries.append(ManifestEntry(
+                        path=rel_path, start_line=sl.start, end_line=sl.end,
+                        title=sl.title, id_value=sl.id_value, seq_no=sl.seq_no, authors=list(sl.authors),
+                        sha256=hasher.hexdigest(), size=st.st_size, mtime_ns=st.st_mtime_ns,
+                        duplicate_of=first_ref if linked else None,
+                    ))
+            elif key is not None:
+                if first is not None:
+                    dups.hits.append(DuplicateHit(fname, sl.start + 1, sl.end + 1, source_label, first["path"], first["source"], "written"))
+                else:
+                    dups.add(key, source_label, fname, persist=False)
+            count += 1
+        self.texts_found += found
+        if undecodable.count:
+            print(f"WARN: {label}{undecodable.count} input bytes are not valid {enc_detected} and were replaced with U+FFFD; "
+                  f"check --input-encoding.", file=sys.stderr)
+        if not found:
+            if compressed:
+                print(f"WARN: {label}No texts detected with current marker configuration.", file=sys.stderr)
+            return 5, 0
+        if replaced_files > MAX_FINDINGS_PER_KIND:
+            print(f"WARN: {label}... {replaced_files - MAX_FINDINGS_PER_KIND} more files with replaced characters", file=sys.stderr)
+        if replaced_total:
+            print(f"WARN: {label}{replaced_total} characters replaced in {replaced_files} files while encoding to {enc_to_use}", file=sys.stderr)
+        if not manifest:
+            return 0, count
+
+        if slices is not None:
+            # Source byte ranges make the manifest usable as a boundary index (e.g. for extract);
+            # offsets into compressed data cannot be seeked to, so they are left out there
+            byte_ranges = line_ranges_to_bytes(input_path, lines, [(sl.start, sl.end) for sl in slices], newline_style, enc_detected)
+            if byte_ranges:
+                for entry, (b_start, b_end) in zip(entries, byte_ranges):
+                    entry.source_start, entry.source_end = b_start, b_end
+        src_st = os.stat(input_path)
+        os.makedirs(output_dir, exist_ok=True)
+        save_manifest(output_dir, Manifest(
+            source=source_abs, source_size=src_st.st_size, source_mtime_ns=src_st.st_mtime_ns,
+            input_encoding=enc_detected, output_encoding=enc_to_use, newline=newline_style,
+            strict=self.strict, entries=entries, output_errors=encoding_errors, source_member=member,
+        ))
+        return 0, count
+
+
+def run_cli(input_path: Optional[str], output_dir: Optional[str], strict: bool, ext: str, encoding: Optional[str], config_path: Optional[str], headless: bool, manifest: bool = False, layout: str = "flat", sqlite_path: Optional[str] = None, duplicates: str = "keep", dup_index_path: Optional[str] = None,
+            input_encoding: Optional[str] = None, output_encoding: Optional[str] = None, encoding_errors: str = "strict", member: Optional[str] = None) -> int:
+    try:
+        layout_name, layout_size = parse_layout(layout)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 4
+    # Sharded outputs are only findable through the index, so always write it
+    manifest = manifest or layout_name != "flat"
+    # --encoding forces both sides; the specific options win
+    input_encoding = input_encoding or encoding
+    output_encoding = output_encoding or encoding
+    for enc_name in (input_encoding, output_encoding):
+        if enc_name:
+            try:
+                codecs.lookup(enc_name)
+            except LookupError:
+                print(f"ERROR: Unknown encoding '{enc_name}'.", file=sys.stderr)
+                return 4
+    try:
+        codecs.lookup_error(encoding_errors)
+    except LookupError:
+        print(f"ERROR: Unknown encoding error policy '{encoding_errors}'.", file=sys.stderr)
+        return 4
+
     # Initial GUI prompt: strict/loose (no custom marker configuration in current version)
     if TOGA_AVAILABLE and not headless:
         # Launch Toga UI entry if available
@@ -104,55 +345,102 @@ def run_cli(input_path: Optional[str], output_dir: Optional[str], strict: bool,
         if not input_path or not os.path.isfile(input_path):
             print("ERROR: Cannot read input file.", file=sys.stderr)
             return 2
-        if not output_dir:
+        if not output_dir and not sqlite_path:
             print("ERROR: No output folder selected.", file=sys.stderr)
             return 3
-        if not os.path.isdir(output_dir):
+        # With --sqlite the output folder is optional: files are only written when one is given
+        if output_dir and not os.path.isdir(output_dir):
             try:
                 os.makedirs(output_dir, exist_ok=True)
             except Exception:
                 print("ERROR: Cannot create output folder.", file=sys.stderr)
                 return 3
-        if not ensure_empty_dir(output_dir):
+        if output_dir and not ensure_empty_dir(output_dir):
             print("ERROR: Output folder must be empty.", file=sys.stderr)
             return 3
 
     # Load default or JSON-provided markers (no UI configuration)
     cfg = load_config(config_path)
 
-    # Read input preserving encoding/newlines
-    lines, newline_style, enc_detected = read_text_preserve(input_path)
-    enc_to_use = encoding or enc_detected
+    # Zip archives: one member, or every SFM member into its own subfolder
+    sources: list[tuple[Optional[str], Optional[str]]] = [(None, output_dir)]
+    if detect_compression(input_path) == "zip":
+        try:
+            members = sfm_members(input_path)
+            if member and member not in members:
+                # An explicitly named member is split even if it does not look like SFM
+                with zipfile.ZipFile(input_path) as zf:
+                    names = zf.namelist()
+                if member not in names:
+                    print(f"ERROR: No member '{member}' in the archive.", file=sys.stderr)
+                    return 2
+            members = [member] if member else members
+        except DECOMPRESSION_ERRORS as e:
+            print(f"ERROR: Cannot read archive: {e}", file=sys.stderr)
+            return 2
+        if not members:
+            print("ERROR: No SFM files found in the archive.", file=sys.stderr)
+            return 2
+        if member or not output_dir:
+            sources = [(m, output_dir) for m in members]
+        else:
+            folders: set[str] = set()
+            sources = []
+            for m in members:
+                folder = dedupe_filename(member_dirname(m), folders)
+                folders.add(folder)
+                sources.append((m, os.path.join(output_dir, folder)))
+    elif member:
+        print("ERROR: --member needs a zip archive as input.", file=sys.stderr)
+        return 2
 
-    # Split texts
-    slices, warnings = parse_and_split(lines, cfg, strict=strict)
-    for w in warnings:
-        print(f"WARN: {w}", file=sys.stderr)
-    if not slices:
+    # Content hashing only runs when duplicates are handled or tracked across runs
+    dups = DuplicateIndex(dup_index_path) if (duplicates != "keep" or dup_index_path) else None
+    sink = SQLiteSink(sqlite_path, source=os.path.abspath(input_path)) if sqlite_path else None
+    job = SplitJob(cfg=cfg, strict=strict, ext=ext, layout_name=layout_name, layout_size=layout_size, manifest=manifest,
+                   input_encoding=input_encoding, output_encoding=output_encoding, encoding_errors=encoding_errors,
+                   duplicates=duplicates, dups=dups, sink=sink)
+    count = 0
+    try:
+        for src_member, src_output in sources:
+            try:
+                code, written = job.split_source(input_path, src_output, src_member)
+            except DECOMPRESSION_ERRORS as e:
+                print(f"ERROR: Cannot decompress {src_member or input_path}: {e}", file=sys.stderr)
+                code, written = 2, 0
+            count += written
+            if len(sources) > 1:
+                print(f"INFO: {src_member}: {written} texts")
+            # A member without texts does not fail the whole archive (checked below)
+            if code and code != 5:
+                if sink is not None:
+                    sink.abort()
+                return code
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
+    if not job.texts_found:
         print("ERROR: No texts found; adjust markers or use --loose.", file=sys.stderr)
+        if sink is not None:
+            sink.abort()
         if TK_AVAILABLE and not headless:
             messagebox.showerror("No texts found", "No texts were detected with the current markers. Try Loose mode or adjust markers via JSON config.")
         return 5
-
-    # Write outputs
-    existing = set()
-    count = 0
-    for sl in slices:
-        # title from priority, authors joined with join_authors_with
-        title = sl.title
-        authors_joined = cfg.join_authors_with.join(sl.authors) if sl.authors else ""
-        fallback = None
-        if sl.id_value:
-            fallback = sl.id_value
-        elif sl.seq_no:
-            fallback = f"no{sl.seq_no}"
-        fname = make_filename(title, [authors_joined] if authors_joined else [], ext=ext, fallback=fallback)
-        fname = dedupe_filename(fname, existing)
-        existing.add(fname)
-
-        out_path = os.path.join(output_dir, fname)
-        write_lines_preserve(out_path, lines[sl.start:sl.end+1], newline_style, enc_to_use)
-        count += 1
+    if sink is not None:
+        sink.close()
+        print(f"INFO: Stored {sink.count} texts in {sqlite_path}" + (f" (replacing {sink.replaced} from an earlier run)" if sink.replaced else ""))
+    if dups is not None:
+        dups.save()
+        if dups.hits:
+            skipped = sum(1 for h in dups.hits if h.action == "skipped")
+            linked = sum(1 for h in dups.hits if h.action == "linked")
+            report = os.path.join(output_dir, DUPLICATES_REPORT_NAME) if output_dir else None
+            if report:
+                dups.write_report(report)
+            print(f"INFO: {len(dups.hits)} duplicate texts ({skipped} skipped, {linked} hard-linked)" + (f"; see {report}" if report else ""))
+    if not output_dir:
+        return 0
 
     print(f"INFO: Wrote {count} texts to {output_dir}")
     if TK_AVAILABLE and not headless:
@@ -167,6 +455,177 @@ def run_cli(input_path: Optional[str], output_dir: Optional[str], strict: bool,
     return 0
 
 
+def run_verify(input_path: str, output_dir: str, full: bool = False) -> int:
+    if not os.path.isfile(input_path):
+        print("ERROR: Cannot read input file.", file=sys.stderr)
+        return 2
+    if not os.path.isdir(output_dir):
+        print("ERROR: Output folder not found.", file=sys.stderr)
+        return 3
+    try:
+        result = verify_outputs(input_path, output_dir, full=full)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 6
+    except (KeyError, *DECOMPRESSION_ERRORS) as e:
+        # e.g. a truncated .gz, or a zip member that is no longer in the archive
+        print(f"ERROR: Cannot read input: {e}", file=sys.stderr)
+        return 2
+
+    shown: dict[str, int] = {}
+    for f in result.findings:
+        shown[f.kind] = shown.get(f.kind, 0) + 1
+        if shown[f.kind] > MAX_FINDINGS_PER_KIND:
+            continue
+        level = "INFO" if f.kind in INFO_KINDS else "WARN"
+        where = f"line {f.first_line}" if f.first_line == f.last_line else f"lines {f.first_line}-{f.last_line}"
+        if f.source_start is not None and f.source_end is not None and f.source_end > f.source_start:
+            where += f", source bytes {f.source_start}-{f.source_end - 1}"
+        if f.path:
+            where += f", {f.path}"
+            if f.output_start is not None and f.output_end is not None:
+                where += f" bytes {f.output_start}-{f.output_end - 1}"
+        print(f"{level}: {f.kind}: {f.detail} ({where})", file=sys.stderr)
+    # Counts include findings that were merged away or not stored in the manifest
+    for kind, n in result.counts.items():
+        printed = min(shown.get(kind, 0), MAX_FINDINGS_PER_KIND)
+        if n > printed:
+            print(f"INFO: ... {n - printed} more '{kind}' findings not shown", file=sys.stderr)
+
+    source_note = "source streamed" if result.streamed_source else "source unchanged"
+    print(f"INFO: Verified {result.texts} texts ({result.hashed} files hashed, {source_note})")
+    return 0 if result.ok else 6
+
+
+def run_compare(input_path: str, config_paths: list[str], modes: list[str], ext: str = ".txt", report_path: Optional[str] = None,
+                member: Optional[str] = None) -> int:
+    if not os.path.isfile(input_path):
+        print("ERROR: Cannot read input file.", file=sys.stderr)
+        return 2
+    configs: list[tuple[str, MarkerConfig]] = []
+    for path in config_paths:
+        # Unlike load_config(), a broken candidate must not silently become the default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                configs.append((os.path.basename(path), MarkerConfig.from_json(json.load(f))))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Cannot load config {path}: {e}", file=sys.stderr)
+            return 4
+    if not configs:
+        configs.append(("default", MarkerConfig()))
+    candidates = [Candidate(f"{label} [{mode}]", cfg, mode == "strict") for label, cfg in configs for mode in modes]
+
+    # Decode and tokenize once for all candidates
+    try:
+        lines, _newline_style, _enc = read_text_preserve(input_path, member=member)
+    except (ValueError, KeyError, *DECOMPRESSION_ERRORS) as e:
+        print(f"ERROR: Cannot read input: {e}", file=sys.stderr)
+        return 2
+    results = compare_candidates(lines, candidates, ext=ext)
+
+    width = max(len(c.label) for c in candidates)
+    print(f"{'candidate':<{width}}  {'texts':>6}  {'untitled':>8}  {'dup-names':>9}  {'+starts':>7}  {'-starts':>7}")
+    for i, res in enumerate(results):
+        plus = "-" if i == 0 else str(len(res.only_here))
+        minus = "-" if i == 0 else str(len(res.only_in_first))
+        print(f"{res.candidate.label:<{width}}  {len(res.slices):>6}  {res.untitled:>8}  {res.duplicate_names:>9}  {plus:>7}  {minus:>7}")
+    for res in results[1:]:
+        for what, starts in (("extra", res.only_here), ("missing", res.only_in_first)):
+            if starts:
+                shown = ", ".join(str(n + 1) for n in starts[:MAX_FINDINGS_PER_KIND])
+                more = f" (+{len(starts) - MAX_FINDINGS_PER_KIND} more)" if len(starts) > MAX_FINDINGS_PER_KIND else ""
+                print(f"INFO: {res.candidate.label}: {what} text starts vs {results[0].candidate.label} at lines {shown}{more}")
+
+    if report_path:
+        report = [{
+            "candidate": res.candidate.label,
+            "strict": res.candidate.strict,
+            "texts": len(res.slices),
+            "untitled": res.untitled,
+            "duplicate_names": res.duplicate_names,
+            "warnings": res.warnings,
+            "extra_start_lines": [n + 1 for n in res.only_here],
+            "missing_start_lines": [n + 1 for n in res.only_in_first],
+            "slices": [{"start_line": sl.start + 1, "end_line": sl.end + 1, "filename": fname}
+                       for sl, fname in zip(res.slices, res.filenames)],
+        } for res in results]
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"INFO: Wrote comparison report to {report_path}")
+    return 0
+
+
+def run_extract(input_path: str, output_dir: str, selectors: Selectors, strict: bool = True, ext: str = ".txt",
+                config_path: Optional[str] = None, index_path: Optional[str] = None, all_matches: bool = False,
+                input_encoding: Optional[str] = None, output_encoding: Optional[str] = None, encoding_errors: str = "strict",
+                member: Optional[str] = None) -> int:
+    if not os.path.isfile(input_path):
+        print("ERROR: Cannot read input file.", file=sys.stderr)
+        return 2
+    if not os.path.isdir(output_dir):
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except Exception:
+            print("ERROR: Cannot create output folder.", file=sys.stderr)
+            return 3
+    if not ensure_empty_dir(output_dir):
+        print("ERROR: Output folder must be empty.", file=sys.stderr)
+        return 3
+
+    texts = undecodable = None
+    unmatched: set[tuple[str, str]] = set()  # selectors that found no text, filled while selecting
+    if index_path:
+        index_dir = os.path.dirname(index_path) if os.path.isfile(index_path) else index_path
+        index = load_manifest(index_dir)
+        if index is None:
+            print(f"WARN: No {MANIFEST_NAME} found at {index_path}; scanning the input instead.", file=sys.stderr)
+        elif not index_matches_source(index, input_path):
+            print("WARN: Boundary index does not match the input (changed since the split, compressed, or no byte ranges); scanning the input instead.", file=sys.stderr)
+        else:
+            texts = iter_indexed(input_path, index, selectors, all_matches=all_matches, unmatched=unmatched)
+            newline_style, enc_detected = index.newline, index.input_encoding
+    if texts is None:
+        cfg = load_config(config_path)
+        undecodable = CountingErrors.get("replace", "decode")
+        undecodable.count = 0
+        try:
+            texts, newline_style, enc_detected = iter_streamed(input_path, cfg, strict, selectors, encoding=input_encoding,
+                                                               all_matches=all_matches, member=member, errors=undecodable.name,
+                                                               unmatched=unmatched)
+        except (ValueError, KeyError, *DECOMPRESSION_ERRORS) as e:
+            print(f"ERROR: Cannot read input: {e}", file=sys.stderr)
+            return 2
+    enc_to_use = output_encoding or enc_detected
+    join_with = load_config(config_path).join_authors_with
+
+    existing = set()
+    count = 0
+    for sl, text_lines in texts:
+        fname = dedupe_filename(slice_filename(sl, join_with, ext=ext), existing)
+        existing.add(fname)
+        try:
+            write_lines_preserve(os.path.join(output_dir, fname), text_lines, newline_style, enc_to_use, errors=encoding_errors)
+        except UnicodeEncodeError as e:
+            print(f"ERROR: {fname}: {enc_to_use} cannot encode {e.object[e.start:e.end]!r}; "
+                  f"choose another --output-encoding or --encoding-errors policy.", file=sys.stderr)
+            return 7
+        print(f"INFO: lines {sl.start + 1}-{sl.end + 1} -> {fname}")
+        count += 1
+    if undecodable is not None and undecodable.count:
+        print(f"WARN: {undecodable.count} input bytes read are not valid {enc_detected} and were replaced with U+FFFD; "
+              f"check --encoding.", file=sys.stderr)
+    for kind, value in sorted(unmatched):
+        print(f"WARN: --{kind} {value} matched no text", file=sys.stderr)
+    if not count:
+        print("ERROR: No texts matched the selectors.", file=sys.stderr)
+        return 5
+    print(f"INFO: Extracted {count} texts to {output_dir}")
+    if unmatched:
+        print(f"ERROR: {len(unmatched)} selector(s) matched no text.", file=sys.stderr)
+        return 5
+    return 0
+
+
 def open_folder_in_os(path: str) -> None:
     try:
         if sys.platform.startswith('win'):
@@ -294,20 +753,330 @@ def configure_markers_ui(cfg: MarkerConfig) -> MarkerConfig:
     return result["cfg"]
 
 
+def run_lint(input_path: str, strict: bool = True, config_path: Optional[str] = None, encoding: Optional[str] = None,
+             member: Optional[str] = None, max_per_kind: int = MAX_FINDINGS_PER_KIND, report_path: Optional[str] = None) -> int:
+    if not os.path.isfile(input_path):
+        print("ERROR: Cannot read input file.", file=sys.stderr)
+        return 2
+    cfg = load_config(config_path)
+    try:
+        result = lint_file(input_path, cfg, strict=strict, encoding=encoding, member=member, max_per_kind=max_per_kind)
+    except (ValueError, KeyError, *DECOMPRESSION_ERRORS) as e:
+        print(f"ERROR: Cannot read input: {e}", file=sys.stderr)
+        return 2
+
+    for d in result.diagnostics:
+        where = f"line {d.first_line}" if d.first_line == d.last_line else f"lines {d.first_line}-{d.last_line}"
+        print(f"WARN: {d.kind}: {d.detail} ({where})", file=sys.stderr)
+    for kind, n in result.counts.items():
+        if n > max_per_kind:
+            print(f"INFO: ... {n - max_per_kind} more '{kind}' diagnostics not shown", file=sys.stderr)
+    if result.unknown_markers:
+        ranked = sorted(result.unknown_markers.items(), key=lambda kv: -kv[1])
+        more = f" (+{len(ranked) - max_per_kind} more)" if len(ranked) > max_per_kind else ""
+        print("INFO: unknown markers: " + ", ".join(f"\\{m} x{n}" for m, n in ranked[:max_per_kind]) + more, file=sys.stderr)
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "input": os.path.abspath(input_path),
+                "encoding": result.encoding,
+                "strict": strict,
+                "lines": result.lines,
+                "texts": result.texts,
+                "counts": result.counts,
+                "unknown_markers": result.unknown_markers,
+                "diagnostics": [asdict(d) for d in result.diagnostics],
+            }, f, ensure_ascii=False, indent=1)
+        print(f"INFO: Wrote lint report to {report_path}")
+    summary = ", ".join(f"{n} {kind}" for kind, n in result.counts.items()) or "no problems"
+    print(f"INFO: Checked {result.lines} lines, {result.texts} texts ({result.encoding}): {summary}")
+    return 0 if result.ok else 6
+
+
+def run_inspect(input_path: str, config_out: Optional[str] = None, encoding: Optional[str] = None, member: Optional[str] = None,
+                sample_blocks: int = DEFAULT_SAMPLE_BLOCKS, block_size: int = DEFAULT_BLOCK_SIZE, full: bool = False,
+                seed: Optional[int] = None, report_path: Optional[str] = None) -> int:
+    if not os.path.isfile(input_path):
+        print("ERROR: Cannot read input file.", file=sys.stderr)
+        return 2
+    try:
+        profile = profile_markers(input_path, encoding=encoding, sample_blocks=sample_blocks, block_size=block_size,
+                                  full=full, seed=seed, member=member)
+    except (ValueError, KeyError, *DECOMPRESSION_ERRORS) as e:
+        print(f"ERROR: Cannot read input: {e}", file=sys.stderr)
+        return 2
+    if not profile.markers:
+        print("ERROR: No markers found.", file=sys.stderr)
+        return 5
+
+    stats = sorted(profile.markers.values(), key=lambda st: -st.estimate)
+    width = max(6, max(len(st.marker) + 1 for st in stats))
+    print(f"{'marker':<{width}}  {'role':<8}  {'count':>10}  {'+/-95%':>8}  {'texts':>6}  followed by")
+    for st in stats:
+        err = "-" if not profile.sampled else ("inf" if math.isinf(st.error) else f"{round(st.error):d}")
+        share = f"{st.text_share:.0%}" if profile.texts_seen else "-"
+        nxt = ", ".join(f"\\{m}" for m, _n in sorted(st.follows.items(), key=lambda kv: -kv[1])[:3])
+        label = "\\" + st.marker
+        print(f"{label:<{width}}  {st.role:<8}  {round(st.estimate):>10}  {err:>8}  {share:>6}  {nxt}")
+    for note in profile.notes:
+        print(f"WARN: {note}", file=sys.stderr)
+    if profile.sampled:
+        print(f"INFO: Sampled {profile.blocks} random blocks plus the start of the file "
+              f"({profile.bytes_read} of {profile.size} bytes); counts are estimates with a 95% margin.")
+        print(f"INFO: About {round(profile.est_texts)} texts (+/- {round(profile.est_texts_error)})")
+    else:
+        print(f"INFO: Scanned all {profile.size} bytes; {round(profile.est_texts)} texts")
+
+    cfg = profile.suggest_config()
+    cfg_json = config_to_json(cfg)
+    for key in ("start_markers", "metadata_markers", "content_markers"):
+        print(f"INFO: {key}: " + " ".join(f"\\{m}" for m in cfg_json[key]))
+    if config_out:
+        with open(config_out, 'w', encoding='utf-8') as f:
+            json.dump(cfg_json, f, ensure_ascii=False, indent=2)
+        print(f"INFO: Wrote marker config to {config_out}")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(profile), f, ensure_ascii=False, indent=1)
+        print(f"INFO: Wrote marker profile to {report_path}")
+    return 0
+
+
+def run_merge(folder: str, output_path: str, order: Optional[str] = None, ext: Optional[str] = None,
+              input_encoding: Optional[str] = None, output_encoding: Optional[str] = None, encoding_errors: str = "strict",
+              newline: Optional[str] = None, overwrite: bool = False) -> int:
+    if not os.path.isdir(folder):
+        print("ERROR: Output folder not found.", file=sys.stderr)
+        return 2
+    if os.path.exists(output_path) and not (overwrite and os.path.isfile(output_path)):
+        print("ERROR: Merged file already exists; use --overwrite to replace it.", file=sys.stderr)
+        return 3
+    for enc_name in (input_encoding, output_encoding):
+        if enc_name:
+            try:
+                codecs.lookup(enc_name)
+            except LookupError:
+                print(f"ERROR: Unknown encoding '{enc_name}'.", file=sys.stderr)
+                return 4
+    try:
+        codecs.lookup_error(encoding_errors)
+    except LookupError:
+        print(f"ERROR: Unknown encoding error policy '{encoding_errors}'.", file=sys.stderr)
+        return 4
+    try:
+        paths, manifest = list_merge_files(folder, order=order, ext=ext, exclude=output_path)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 6
+    missing = [p for p in paths if not os.path.isfile(p)]
+    if missing:
+        for p in missing[:MAX_FINDINGS_PER_KIND]:
+            print(f"ERROR: missing: {p}", file=sys.stderr)
+        print(f"ERROR: {len(missing)} files listed in the manifest are missing.", file=sys.stderr)
+        return 2
+    if not paths:
+        print("ERROR: No texts found to merge.", file=sys.stderr)
+        return 5
+    if os.path.abspath(output_path) in {os.path.abspath(p) for p in paths}:
+        print("ERROR: The merged file cannot be one of the texts being merged.", file=sys.stderr)
+        return 3
+
+    enc = source_encoding(paths, manifest, input_encoding)
+    try:
+        result = merge_files(paths, output_path, enc, out_encoding=output_encoding, newline=newline,
+                             errors=encoding_errors, overwrite=overwrite, unchanged=unchanged_outputs(folder, manifest))
+    except (UnicodeDecodeError, UnicodeEncodeError) as e:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        if isinstance(e, UnicodeDecodeError):
+            print(f"ERROR: Cannot decode a text as {enc}; set --input-encoding.", file=sys.stderr)
+            return 2
+        print(f"ERROR: {output_encoding or enc} cannot encode {e.object[e.start:e.end]!r}; "
+              f"choose another --output-encoding or --encoding-errors policy.", file=sys.stderr)
+        return 7
+
+    methods = ", ".join(f"{name}: {n}" for name, n in result.methods.items())
+    print(f"INFO: Merged {result.files} texts ({result.bytes_written} bytes, {result.encoding}, "
+          f"{result.newline.encode('unicode_escape').decode()} between texts) into {output_path} [{methods}]")
+    return 0
+
+
 def build_arg_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Split multi-text SFM files into individual files.")
     p.add_argument("input", nargs="?", help="Input SFM/text file path")
-    p.add_argument("output", nargs="?", help="Output folder (must be empty)")
+    p.add_argument("output", nargs="?", help="Output folder (must be empty; optional with --sqlite)")
     p.add_argument("--strict", action="store_true", help="Strict mode (default): start markers only")
     p.add_argument("--loose", action="store_true", help="Loose mode: allow blank-line/content heuristics")
     p.add_argument("--cli", action="store_true", help="Run without GUI dialogs")
     p.add_argument("--extension", default=".txt", help="Output extension (default .txt)")
     p.add_argument("--encoding", default=None, help="Force input/output encoding (default: auto)")
+    p.add_argument("--input-encoding", default=None, help="Force the input encoding (default: --encoding, else auto)")
+    p.add_argument("--output-encoding", default=None, help="Transcode outputs to this encoding while writing (default: --encoding, else the input encoding)")
+    p.add_argument("--encoding-errors", default="strict", help="Characters the output encoding cannot represent: strict (default, abort), replace, ignore, xmlcharrefreplace or backslashreplace")
+    p.add_argument("--config", default=None, help="JSON marker config file path")
+    p.add_argument("--manifest", action="store_true", help="Write a manifest of outputs and digests (needed by 'verify')")
+    p.add_argument("--layout", default="flat", help="Output layout: flat (default), prefix[:chars], range[:texts_per_folder] or hash[:buckets]; non-flat layouts always write the manifest index")
+    p.add_argument("--sqlite", default=None, help="Also store every text with its metadata in this SQLite database")
+    p.add_argument("--duplicates", choices=["keep", "skip", "link"], default="keep", help="Texts whose normalized content was already seen: keep (default), skip, or hard-link to the first copy")
+    p.add_argument("--dup-index", default=None, help="JSON file of content hashes shared across runs, to detect duplicates across several exports")
+    p.add_argument("--member", default=None, help="Zip input: split only this member, straight into the output folder (default: every SFM member into its own subfolder)")
+    return p
+
+
+def build_verify_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm verify", description="Check that split outputs add up to the source file.")
+    p.add_argument("input", help="Input SFM/text file that was split")
+    p.add_argument("output", help="Output folder containing the split manifest")
+    p.add_argument("--full", action="store_true", help="Re-check every output, ignoring cached digests")
+    return p
+
+
+def main_verify(argv: list[str]) -> int:
+    args = build_verify_parser().parse_args(argv)
+    return run_verify(args.input, args.output, full=args.full)
+
+
+def build_compare_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm compare", description="Compare marker configurations and modes on one input in a single pass.")
+    p.add_argument("input", help="Input SFM/text file")
+    p.add_argument("--config", action="append", default=[], help="Candidate JSON marker config (repeatable; default: built-in markers)")
+    p.add_argument("--modes", default="strict,loose", help="Comma-separated modes to try (default: strict,loose)")
+    p.add_argument("--extension", default=".txt", help="Output extension used for filenames (default .txt)")
+    p.add_argument("--report", default=None, help="Write a detailed JSON report to this path")
+    p.add_argument("--member", default=None, help="Zip input: the member to compare on")
+    return p
+
+
+def main_compare(argv: list[str]) -> int:
+    ap = build_compare_parser()
+    args = ap.parse_args(argv)
+    modes = [m.strip().lower() for m in args.modes.split(",") if m.strip()]
+    if not modes or any(m not in ("strict", "loose") for m in modes):
+        ap.error("--modes must list 'strict' and/or 'loose'")
+    return run_compare(args.input, args.config, modes, ext=args.extension, report_path=args.report, member=args.member)
+
+
+def build_extract_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm extract", description="Write only the selected texts of an SFM file.")
+    p.add_argument("input", help="Input SFM/text file")
+    p.add_argument("output", help="Output folder (must be empty)")
+    p.add_argument("--id", action="append", default=[], help="Select the text with this \\id value (repeatable)")
+    p.add_argument("--title", action="append", default=[], help="Select texts whose title matches this regular expression (repeatable)")
+    p.add_argument("--seq", action="append", default=[], help="Select the text with this \\no value (repeatable)")
+    p.add_argument("--slice", action="append", type=int, default=[], help="Select the Nth detected text, 1-based (repeatable)")
+    p.add_argument("--all", action="store_true", help="Write every match and scan to the end (default: first match per selector, stop early)")
+    p.add_argument("--index", default=None, help="Boundary index: manifest or output folder of an earlier split of this input, to seek instead of scan")
+    p.add_argument("--loose", action="store_true", help="Loose mode when scanning")
+    p.add_argument("--config", default=None, help="JSON marker config file path (when scanning)")
+    p.add_argument("--extension", default=".txt", help="Output extension (default .txt)")
+    p.add_argument("--encoding", default=None, help="Force the input encoding (default: auto)")
+    p.add_argument("--output-encoding", default=None, help="Output encoding (default: the input encoding)")
+    p.add_argument("--encoding-errors", default="strict", help="Policy for characters the output encoding cannot represent (default strict)")
+    p.add_argument("--member", default=None, help="Zip input: the member to read (needed when the archive holds several SFM files)")
+    return p
+
+
+def main_extract(argv: list[str]) -> int:
+    ap = build_extract_parser()
+    args = ap.parse_args(argv)
+    try:
+        titles = [re.compile(t) for t in args.title]
+    except re.error as e:
+        ap.error(f"invalid --title pattern: {e}")
+    selectors = Selectors(ids=args.id, titles=titles, seqs=args.seq, slices=args.slice)
+    if not selectors.keys():
+        ap.error("give at least one of --id, --title, --seq or --slice")
+    return run_extract(args.input, args.output, selectors, strict=not args.loose, ext=args.extension,
+                       config_path=args.config, index_path=args.index, all_matches=args.all,
+                       input_encoding=args.encoding, output_encoding=args.output_encoding, encoding_errors=args.encoding_errors,
+                       member=args.member)
+
+
+def build_lint_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm lint", description="Check an SFM file for common input problems without writing anything.")
+    p.add_argument("input", help="Input SFM/text file")
+    p.add_argument("--loose", action="store_true", help="Check as a Loose mode split would see the input")
     p.add_argument("--config", default=None, help="JSON marker config file path")
+    p.add_argument("--encoding", default=None, help="Force the input encoding (default: auto)")
+    p.add_argument("--member", default=None, help="Zip input: the member to check")
+    p.add_argument("--max-per-kind", type=int, default=MAX_FINDINGS_PER_KIND, help=f"Diagnostics shown per category (default {MAX_FINDINGS_PER_KIND}; all are counted)")
+    p.add_argument("--report", default=None, help="Write the diagnostics and counts as JSON to this path")
     return p
 
 
+def main_lint(argv: list[str]) -> int:
+    args = build_lint_parser().parse_args(argv)
+    return run_lint(args.input, strict=not args.loose, config_path=args.config, encoding=args.encoding,
+                    member=args.member, max_per_kind=args.max_per_kind, report_path=args.report)
+
+
+def build_inspect_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm inspect", description="Profile the markers of an SFM file and suggest a marker config.")
+    p.add_argument("input", help="Input SFM/text file")
+    p.add_argument("--write-config", default=None, help="Write the suggested marker config JSON to this path")
+    p.add_argument("--report", default=None, help="Write the full marker profile as JSON to this path")
+    p.add_argument("--full", action="store_true", help="Scan the whole input instead of sampling large files")
+    p.add_argument("--sample-blocks", type=int, default=DEFAULT_SAMPLE_BLOCKS, help=f"Random blocks read from large files (default {DEFAULT_SAMPLE_BLOCKS})")
+    p.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE // 1024, help=f"Sample block size in KiB (default {DEFAULT_BLOCK_SIZE // 1024})")
+    p.add_argument("--seed", type=int, default=None, help="Random seed, for repeatable samples")
+    p.add_argument("--encoding", default=None, help="Force the input encoding (default: auto)")
+    p.add_argument("--member", default=None, help="Zip input: the member to inspect")
+    return p
+
+
+def main_inspect(argv: list[str]) -> int:
+    ap = build_inspect_parser()
+    args = ap.parse_args(argv)
+    if args.sample_blocks < 2:
+        ap.error("--sample-blocks must be at least 2")
+    if args.block_size < 1:
+        ap.error("--block-size must be at least 1")
+    return run_inspect(args.input, config_out=args.write_config, encoding=args.encoding, member=args.member,
+                       sample_blocks=args.sample_blocks, block_size=args.block_size * 1024, full=args.full,
+                       seed=args.seed, report_path=args.report)
+
+
+def build_merge_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="split_sfm merge", description="Join the texts of an output folder back into one SFM file.")
+    p.add_argument("folder", help="Folder with split (and possibly edited) texts")
+    p.add_argument("output", help="Merged SFM file to write")
+    p.add_argument("--order", choices=["manifest", "name"], default=None, help="Source order from the split manifest, or sorted file paths (default: manifest if present)")
+    p.add_argument("--extension", default=None, help="In name order, only merge files with this extension (default: all texts)")
+    p.add_argument("--input-encoding", default=None, help="Encoding of the texts (default: from the manifest, else detected)")
+    p.add_argument("--output-encoding", default=None, help="Encoding of the merged file (default: the input encoding; a different one transcodes instead of copying)")
+    p.add_argument("--encoding-errors", default="strict", help="Policy for characters the output encoding cannot represent (default strict)")
+    p.add_argument("--newline", choices=sorted(NEWLINE_STYLES), default=None, help="Newline between texts (default: detected from the texts)")
+    p.add_argument("--overwrite", action="store_true", help="Replace an existing merged file")
+    return p
+
+
+def main_merge(argv: list[str]) -> int:
+    args = build_merge_parser().parse_args(argv)
+    return run_merge(args.folder, args.output, order=args.order, ext=args.extension,
+                     input_encoding=args.input_encoding, output_encoding=args.output_encoding,
+                     encoding_errors=args.encoding_errors, newline=NEWLINE_STYLES.get(args.newline or ""),
+                     overwrite=args.overwrite)
+
+
+# Subcommands, selected by the first argument; anything else is a split
+COMMANDS = {
+    "verify": main_verify,
+    "compare": main_compare,
+    "extract": main_extract,
+    "lint": main_lint,
+    "inspect": main_inspect,
+    "merge": main_merge,
+}
+
+
 def main(argv: Optional[list[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
     ap = build_arg_parser()
     args = ap.parse_args(argv)
 
@@ -321,6 +1090,15 @@ def main(argv: Optional[list[str]] = None) -> int:
         encoding=args.encoding,
         config_path=args.config,
         headless=args.cli,
+        manifest=args.manifest,
+        layout=args.layout,
+        sqlite_path=args.sqlite,
+        duplicates=args.duplicates,
+        dup_index_path=args.dup_index,
+        input_encoding=args.input_encoding,
+        output_encoding=args.output_encoding,
+        encoding_errors=args.encoding_errors,
+        member=args.member,
     )
     return code
 
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    title TEXT,
+    authors TEXT,          -- JSON array, in \\a order
+    id_value TEXT,         -- \\id
+    seq_no TEXT,           -- \\no
+    first_line INTEGER NOT NULL,  -- 1-based, inclusive range in the source
+    last_line INTEGER NOT NULL,
+    content TEXT NOT NULL
+)
+"""
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS texts_title ON texts(title)",
+    "CREATE INDEX IF NOT EXISTS texts_id_value ON texts(id_value)",
+)
+_INSERT = ("INSERT INTO texts (source, filename, title, authors, id_value, seq_no, first_line, last_line, content) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+_DELETE_SOURCE = "DELETE FROM texts WHERE source = ?"
+
+
+class SQLiteSink:
+    """
+    Collects split texts into a SQLite database in one transaction.
+    Rows are buffered and inserted with executemany; indexes are built on close().
+    Rows an earlier run stored for the same source are replaced in that transaction,
+    so a database can collect several sources and re-running one does not duplicate it.
+    """
+
+    def __init__(self, db_path: str, source: str, batch_size: int = 500):
+        parent = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(parent, exist_ok=True)
+        self.batch_size = batch_size
+        self.count = 0
+        self.replaced = 0  # rows of earlier runs removed
+        self._batch: List[tuple] = []
+        # Autocommit mode so the single explicit transaction below is the only one
+        self._conn = sqlite3.connect(db_path, isolation_level=None)
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("BEGIN")
+        self.source = source
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @source.setter
+    def source(self, value: str) -> None:
+        """Switch to another source (e.g. the next zip member), dropping its rows from earlier runs."""
+        self._source = value
+        self.replaced += self._conn.execute(_DELETE_SOURCE, (value,)).rowcount
+
+    def add(self, filename: str, content: str, title: Optional[str], authors: List[str], id_value: Optional[str],
+            seq_no: Optional[str], start: int, end: int) -> None:
+        """Queue one text; start/end are 0-based inclusive line indexes like TextSlice."""
+        self._batch.append((self.source, filename, title, json.dumps(authors, ensure_ascii=False),
+                            id_value, seq_no, start + 1, end + 1, content))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch:
+            self._conn.executemany(_INSERT, self._batch)
+            self.count += len(self._batch)
+            self._batch.clear()
+
+    def close(self) -> int:
+        """Commit everything, build indexes and return the number of rows written."""
+        try:
+            self._flush()
+            for stmt in _INDEXES:
+                self._conn.execute(stmt)
+            self._conn.execute("COMMIT")
+        finally:
+            self._conn.close()
+        return self.count
+
+    def abort(self) -> None:
+        try:
+            self._conn.execute("ROLLBACK")
+        finally:
+            self._conn.close()
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import codecs
+import hashlib
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+# Robust import so it works under PyInstaller, module, and script modes
+try:
+    from scripts.io_utils import iter_source_lines
+    from scripts.manifest import Manifest, ManifestEntry, file_sha256, load_manifest, save_manifest
+except Exception:
+    try:
+        from io_utils import iter_source_lines
+        from manifest import Manifest, ManifestEntry, file_sha256, load_manifest, save_manifest
+    except Exception:
+        from .io_utils import iter_source_lines
+        from .manifest import Manifest, ManifestEntry, file_sha256, load_manifest, save_manifest
+
+# Changes the splitter makes by design; everything else means lost or changed content
+INFO_KINDS = ("bom", "newline", "duplicate")
+PROBLEM_KINDS = ("dropped", "decode", "mismatch", "missing", "truncated")
+# Findings kept per kind (in the result and the manifest); the rest are only counted
+STORED_FINDINGS_PER_KIND = 100
+
+
+@dataclass
+class Finding:
+    kind: str
+    first_line: int  # 1-based, inclusive
+    last_line: int
+    source_start: Optional[int] = None  # byte range in the source, end exclusive
+    source_end: Optional[int] = None
+    path: Optional[str] = None  # output file, for per-file findings
+    output_start: Optional[int] = None  # byte range in the output file, end exclusive
+    output_end: Optional[int] = None
+    detail: str = ""
+
+
+@dataclass
+class VerifyResult:
+    findings: List[Finding] = field(default_factory=list)  # first STORED_FINDINGS_PER_KIND of each kind
+    counts: Dict[str, int] = field(default_factory=dict)  # all findings per kind, stored or not
+    texts: int = 0
+    hashed: int = 0  # output files read during this run
+    streamed_source: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.counts.get(k) for k in PROBLEM_KINDS)
+
+
+class _OpenSlice:
+    """Lockstep comparison state for the output file of one manifest entry."""
+
+    def __init__(self, entry: ManifestEntry, path: str, encoding: str, errors: str = "replace"):
+        self.entry = entry
+        self.fh = open(path, 'rb')
+        self.encoder = codecs.getincrementalencoder(encoding)(errors=errors)
+        self.hasher = hashlib.sha256()
+        self.pos = 0
+
+    def compare(self, expected: bytes) -> Optional[tuple[int, int]]:
+        """Read len(expected) bytes; return the output byte range if they differ."""
+        actual = self.fh.read(len(expected))
+        self.hasher.update(actual)
+        start = self.pos
+        self.pos += len(expected)
+        if actual != expected:
+            return start, self.pos
+        return None
+
+    def finish(self) -> Optional[tuple[int, int]]:
+        """Check the encoder tail and report trailing bytes the source does not account for."""
+        bad = self.compare(self.encoder.encode("", final=True))
+        extra_start = self.pos
+        for chunk in iter(lambda: self.fh.read(1 << 20), b""):
+            self.hasher.update(chunk)
+            self.pos += len(chunk)
+        self.fh.close()
+        if self.pos > extra_start:
+            return (bad[0] if bad else extra_start), self.pos
+        return bad
+
+
+class _Findings:
+    """Findings in source order: adjacent lines of one kind merge into a range, each kind is capped."""
+
+    def __init__(self, cap: int = STORED_FINDINGS_PER_KIND):
+        self.cap = cap
+        self.items: List[Finding] = []
+        self.counts: Dict[str, int] = {}
+        self.last: Dict[str, Finding] = {}  # latest range per kind, stored or not
+
+    def add(self, f: Finding) -> None:
+        last = self.last.get(f.kind)
+        if (last is not None and last.path == f.path and last.detail == f.detail
+                and last.last_line + 1 == f.first_line):
+            last.last_line = f.last_line
+            if f.source_end is not None:
+                last.source_end = f.source_end
+            if f.output_end is not None:
+                last.output_end = f.output_end
+            return
+        n = self.counts.get(f.kind, 0) + 1
+        self.counts[f.kind] = n
+        self.last[f.kind] = f
+        if n <= self.cap:
+            self.items.append(f)
+
+    def extend(self, findings: List[Finding]) -> None:
+        for f in findings:
+            self.add(f)
+
+
+def _stat_unchanged(st: os.stat_result, size: int, mtime_ns: int) -> bool:
+    return st.st_size == size and st.st_mtime_ns == mtime_ns
+
+
+def verify_outputs(input_path: str, output_dir: str, full: bool = False) -> VerifyResult:
+    """
+    Check that the outputs listed in the output folder's manifest add up to the source.
+
+    The source and every output that changed since the last check are streamed once,
+    line by line, comparing each output against the bytes its source lines should
+    produce. Digests and findings are stored back into the manifest, so later runs
+    only hash files whose size or mtime changed.
+    Raises ValueError when there is no usable manifest.
+    """
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        raise ValueError("No split manifest found in the output folder; split with --manifest first.")
+
+    result = VerifyResult(texts=len(manifest.entries))
+    src_st = os.stat(input_path)
+    cached = manifest.verified or {}
+    source_same = bool(cached) and _stat_unchanged(src_st, cached.get("source_size", -1), cached.get("source_mtime_ns", -1))
+    cached_findings = [Finding(**f) for f in cached.get("findings", [])] if source_same and not full else []
+    cached_counts: Dict[str, int] = cached.get("counts", {}) if source_same and not full else {}
+
+    # Decide which outputs need comparing against the source
+    to_compare: set[str] = set()
+    missing: set[str] = set()
+    hashed: set[str] = set()
+    for e in manifest.entries:
+        if e.duplicate_of:
+            # skipped or hard-linked duplicate: its bytes belong to the first copy
+            continue
+        out_path = os.path.join(output_dir, e.path)
+        try:
+            st = os.stat(out_path)
+        except OSError:
+            missing.add(e.path)
+            continue
+        if full or not source_same:
+            to_compare.add(e.path)
+            continue
+        if _stat_unchanged(st, e.size, e.mtime_ns):
+            continue
+        hashed.add(e.path)
+        if file_sha256(out_path) == e.sha256:
+            # touched but identical: just remember the new mtime
+            e.mtime_ns = st.st_mtime_ns
+            continue
+        to_compare.add(e.path)
+
+    if not to_compare and source_same and not full:
+        # Nothing changed since the last full check: reuse its findings and totals
+        result.findings = [f for f in cached_findings if f.kind != "missing"]
+        result.counts = {k: n for k, n in cached_counts.items() if k != "missing"}
+        found = _Findings()
+        found.extend(Finding("missing", e.start_line + 1, e.end_line + 1, path=e.path, detail="output file not found")
+                     for e in manifest.entries if e.path in missing)
+        result.findings += found.items
+        result.counts.update(found.counts)
+        manifest.verified = {"source_size": src_st.st_size, "source_mtime_ns": src_st.st_mtime_ns,
+                             "findings": [asdict(f) for f in result.findings], "counts": result.counts}
+        result.hashed = len(hashed)
+        save_manifest(output_dir, manifest)
+        return result
+
+    found = _stream_compare(input_path, output_dir, manifest, to_compare, missing)
+    result.hashed = len(hashed | to_compare)
+    if source_same and not full:
+        # The source side was recomputed; carry over mismatches of outputs we trusted this time
+        # (only the stored ones are known; earlier mismatches beyond the cap are not re-reported)
+        found.extend(f for f in cached_findings if f.kind == "mismatch" and f.path not in to_compare and f.path not in missing)
+        found.items.sort(key=lambda f: f.first_line)
+    result.findings = found.items
+    result.counts = found.counts
+    result.streamed_source = True
+    manifest.verified = {"source_size": src_st.st_size, "source_mtime_ns": src_st.st_mtime_ns,
+                         "findings": [asdict(f) for f in result.findings], "counts": result.counts}
+    save_manifest(output_dir, manifest)
+    return result
+
+
+def _stream_compare(input_path: str, output_dir: str, manifest: Manifest, to_compare: set[str], missing: set[str]) -> _Findings:
+    findings = _Findings()
+    entries = sorted(manifest.entries, key=lambda e: e.start_line)
+    nl_src = manifest.newline.encode(manifest.input_encoding)
+    nl_out = manifest.newline
+    ptr = 0
+    cur: Optional[_OpenSlice] = None
+    last_index = -1
+
+    for ln in iter_source_lines(input_path, manifest.input_encoding, member=manifest.source_member):
+        last_index = ln.index
+        if ln.index == 0 and ln.start > 0:
+            findings.add(Finding("bom", 1, 1, 0, ln.start, detail="byte order mark stripped"))
+        while ptr < len(entries) and entries[ptr].end_line < ln.index:
+            ptr += 1
+        e = entries[ptr] if ptr < len(entries) and entries[ptr].start_line <= ln.index else None
+        if e is None:
+            findings.add(Finding("dropped", ln.index + 1, ln.index + 1, ln.start, ln.end + len(ln.terminator),
+                                 detail="not part of any output text"))
+            continue
+
+        first = ln.index == e.start_line
+        is_last = ln.index == e.end_line
+        if first:
+            e.source_start = ln.start
+            if e.duplicate_of:
+                findings.add(Finding("duplicate", e.start_line + 1, e.end_line + 1, path=e.path or None,
+                                        detail=f"duplicate of {e.duplicate_of}" + ("" if e.path else " (not written)")))
+            if e.path in to_compare:
+                # A strict split never met unencodable text; don't let verify crash on it either
+                errors = manifest.output_errors if manifest.output_errors != "strict" else "replace"
+                cur = _OpenSlice(e, os.path.join(output_dir, e.path), manifest.output_encoding, errors)
+        if not ln.decoded_ok:
+            findings.add(Finding("decode", ln.index + 1, ln.index + 1, ln.start, ln.end, path=e.path or None,
+                                    detail=f"undecodable bytes replaced ({manifest.input_encoding})"))
+        if not is_last and ln.terminator != nl_src:
+            findings.add(Finding("newline", ln.index + 1, ln.index + 1, ln.end, ln.end + len(ln.terminator), path=e.path or None,
+                                    detail=f"{ln.terminator!r} written as {nl_src!r}"))
+        if cur is not None:
+            expected = cur.encoder.encode(ln.text if first else nl_out + ln.text)
+            bad = cur.compare(expected)
+            if bad:
+                findings.add(Finding("mismatch", ln.index + 1, ln.index + 1, ln.start, ln.end, path=e.path,
+                                     output_start=bad[0], output_end=bad[1], detail="output differs from source"))
+        if is_last:
+            e.source_end = ln.end
+            if cur is not None:
+                bad = cur.finish()
+                if bad:
+                    findings.add(Finding("mismatch", ln.index + 1, ln.index + 1, ln.end, ln.end, path=e.path,
+                                            output_start=bad[0], output_end=bad[1], detail="unexpected trailing bytes in output"))
+                st = os.stat(os.path.join(output_dir, e.path))
+                e.sha256 = cur.hasher.hexdigest()
+                e.size = st.st_size
+                e.mtime_ns = st.st_mtime_ns
+                cur = None
+            ptr += 1
+
+    if cur is not None:
+        cur.fh.close()
+    for e in entries:
+        if e.path in missing:
+            findings.add(Finding("missing", e.start_line + 1, e.end_line + 1, path=e.path, detail="output file not found"))
+        elif e.end_line > last_index:
+            findings.add(Finding("truncated", e.start_line + 1, e.end_line + 1, path=e.path or None,
+                                    detail="source ends before this text; it changed since the split"))
+    return findings
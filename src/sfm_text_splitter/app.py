@@ -1,3 +1,5 @@
+import asyncio
+import json
 import os
 import subprocess
 import sys
@@ -10,19 +12,26 @@ from toga.style.pack import COLUMN, ROW
 # Reuse existing logic from the repo
 try:
     from scripts.marker_config import MarkerConfig
-    from scripts.sfm_parser import parse_and_split
-    from scripts.io_utils import read_text_preserve, write_lines_preserve
-    from scripts.filename_utils import make_filename, dedupe_filename
+    from scripts.io_utils import write_lines_preserve
+    from scripts.filename_utils import slice_filename, dedupe_filename
+    from scripts.doc_cache import DocumentCache
 except Exception:
     # Fallback to relative imports if packaged differently
     from ..scripts.marker_config import MarkerConfig  # type: ignore
-    from ..scripts.sfm_parser import parse_and_split  # type: ignore
-    from ..scripts.io_utils import read_text_preserve, write_lines_preserve  # type: ignore
-    from ..scripts.filename_utils import make_filename, dedupe_filename  # type: ignore
+    from ..scripts.io_utils import write_lines_preserve  # type: ignore
+    from ..scripts.filename_utils import slice_filename, dedupe_filename  # type: ignore
+    from ..scripts.doc_cache import DocumentCache  # type: ignore
+
+# Rows shown in the preview table; larger inputs show a count instead
+PREVIEW_MAX_ROWS = 2000
 
 
 def ensure_empty_dir(path: str) -> bool:
-    return os.path.isdir(path) and len(os.listdir(path)) == 0
+    if not os.path.isdir(path):
+        return False
+    # Stop at the first entry instead of listing a possibly huge folder
+    with os.scandir(path) as it:
+        return next(it, None) is None
 
 
 def open_folder_in_os(path: str) -> None:
@@ -48,6 +57,8 @@ class SFMTextSplitterApp(toga.App):
         self.config_path: Optional[str] = None
         self.extension: str = ".txt"
         self.encoding: Optional[str] = None
+        # Decoded + tokenized inputs, so mode/config changes only rerun the boundary pass
+        self.doc_cache = DocumentCache()
 
         # Controls
         mode_label = toga.Label("Mode")
@@ -70,6 +81,9 @@ class SFMTextSplitterApp(toga.App):
         run_btn = toga.Button("Run Split", style=Pack(padding_top=10), on_press=self.on_run_split)
         self.status = toga.Label("", style=Pack(color="#0a0"))
 
+        self.preview_label = toga.Label("Preview: select an input file")
+        self.preview = toga.Table(headings=["#", "Title", "Filename", "Lines"], style=Pack(flex=1, height=240))
+
         # Layout
         row1 = toga.Box(children=[mode_label, self.mode_select], style=Pack(direction=ROW, padding=6, alignment="center"))
         row2 = toga.Box(children=[input_label, input_btn], style=Pack(direction=ROW, padding=6, alignment="center"))
@@ -80,14 +94,61 @@ class SFMTextSplitterApp(toga.App):
         row4b = toga.Box(children=[self.config_value], style=Pack(direction=ROW, padding_left=12))
         row5 = toga.Box(children=[run_btn], style=Pack(direction=ROW, padding=10))
         row6 = toga.Box(children=[self.status], style=Pack(direction=ROW, padding=6))
+        row7 = toga.Box(children=[self.preview_label], style=Pack(direction=ROW, padding=6))
+        row8 = toga.Box(children=[self.preview], style=Pack(direction=ROW, padding=6, flex=1))
 
-        content = toga.Box(children=[row1, row2, row2b, row3, row3b, row4, row4b, row5, row6], style=Pack(direction=COLUMN, padding=12))
+        content = toga.Box(children=[row1, row2, row2b, row3, row3b, row4, row4b, row5, row6, row7, row8], style=Pack(direction=COLUMN, padding=12))
         self.main_window.content = content
         self.main_window.show()
 
+    def load_config(self) -> MarkerConfig:
+        try:
+            if self.config_path:
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return MarkerConfig.from_json(data)
+        except Exception:
+            pass
+        return MarkerConfig()
+
+    async def refresh_preview(self):
+        if not self.input_path or not os.path.isfile(self.input_path):
+            return
+        path = self.input_path
+        try:
+            # Reading/decoding may be slow on big files; keep the UI responsive
+            doc = await asyncio.get_running_loop().run_in_executor(None, self.doc_cache.get, path)
+        except Exception as e:
+            if path != self.input_path:
+                return
+            self.preview_label.text = f"Preview unavailable: {e}"
+            self.preview.data = []
+            return
+        if doc.path != self.input_path:
+            # Another file was chosen while this one loaded; its own refresh fills the table
+            return
+        cfg = self.load_config()
+        slices, warnings = doc.split(cfg, strict=self.strict)
+        rows = []
+        existing = set()
+        for n, sl in enumerate(slices, start=1):
+            fname = dedupe_filename(slice_filename(sl, cfg.join_authors_with, ext=self.extension), existing)
+            existing.add(fname)
+            if n <= PREVIEW_MAX_ROWS:
+                rows.append((str(n), sl.title or "", fname, str(sl.end - sl.start + 1)))
+        self.preview.data = rows
+        mode = "Strict" if self.strict else "Loose"
+        if not slices:
+            self.preview_label.text = f"Preview ({mode}): " + " ".join(warnings)
+        elif len(slices) > PREVIEW_MAX_ROWS:
+            self.preview_label.text = f"Preview ({mode}): {len(slices)} texts, showing the first {PREVIEW_MAX_ROWS}"
+        else:
+            self.preview_label.text = f"Preview ({mode}): {len(slices)} texts"
+
     # Handlers
-    def on_mode_select(self, widget):
+    async def on_mode_select(self, widget):
         self.strict = (widget.value == "Strict")
+        await self.refresh_preview()
 
     async def on_select_input(self, widget, **kwargs):
         try:
@@ -103,6 +164,7 @@ class SFMTextSplitterApp(toga.App):
         if path:
             self.input_path = path
             self.input_value.text = path
+            await self.refresh_preview()
 
     async def on_select_output(self, widget, **kwargs):
         try:
@@ -139,6 +201,7 @@ class SFMTextSplitterApp(toga.App):
         if path:
             self.config_path = path
             self.config_value.text = path
+            await self.refresh_preview()
 
     async def on_run_split(self, widget):
         if not self.input_path or not os.path.isfile(self.input_path):
@@ -151,25 +214,15 @@ class SFMTextSplitterApp(toga.App):
             await self.main_window.dialog(toga.ErrorDialog("Invalid output folder", "Output folder must be empty."))
             return
 
-        # Load config
-        cfg: MarkerConfig
-        try:
-            if self.config_path:
-                import json
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                cfg = MarkerConfig.from_json(data)
-            else:
-                cfg = MarkerConfig()
-        except Exception:
-            cfg = MarkerConfig()
+        cfg = self.load_config()
 
-        # Read input preserving encoding/newlines
-        lines, newline_style, enc_detected = read_text_preserve(self.input_path)
+        # Reuse the decoded/tokenized input from the preview when unchanged on disk
+        doc = self.doc_cache.get(self.input_path)
+        lines, newline_style, enc_detected = doc.lines, doc.newline_style, doc.encoding
         enc_to_use = self.encoding or enc_detected
 
         # Split
-        slices, warnings = parse_and_split(lines, cfg, strict=self.strict)
+        slices, warnings = doc.split(cfg, strict=self.strict)
         if warnings:
             # Show warnings inline but don't interrupt flow
             self.status.text = "\n".join([f"WARN: {w}" for w in warnings])
@@ -181,14 +234,7 @@ class SFMTextSplitterApp(toga.App):
         existing = set()
         count = 0
         for sl in slices:
-            title = sl.title
-            authors_joined = cfg.join_authors_with.join(sl.authors) if sl.authors else ""
-            fallback = None
-            if sl.id_value:
-                fallback = sl.id_value
-            elif sl.seq_no:
-                fallback = f"no{sl.seq_no}"
-            fname = make_filename(title, [authors_joined] if authors_joined else [], ext=self.extension, fallback=fallback)
+            fname = slice_filename(sl, cfg.join_authors_with, ext=self.extension)
             fname = dedupe_filename(fname, existing)
             existing.add(fname)
 